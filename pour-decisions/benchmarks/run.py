@@ -0,0 +1,300 @@
+"""Micro-benchmarks for engine actions, event sampling, persistence, startup, content packs and export.
+
+Run from the project root:
+
+    python -m benchmarks.run [--output benchmarks/results.json] [--quick]
+
+Each case is timed with ``perf_counter`` over repeated rounds of at least
+``--min-time`` seconds; the best round is reported. Results are written as
+JSON so runs can be diffed to catch regressions. Startup cases launch fresh
+interpreters and report the best of ``--rounds`` wall times instead.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional
+
+from pour_decisions import data
+from pour_decisions.content import load_pack
+from pour_decisions.engine import GameEngine
+from pour_decisions.export import careers, open_sink
+from pour_decisions.models import EventTable, ShiftEvent, ShiftOutcome, StoryChoice, StoryEvent
+from pour_decisions.sim import grind_policy
+from pour_decisions.storage import WriteBehindSaver, load_state, save_state
+
+Result = Dict[str, object]
+
+ROOT = Path(__file__).resolve().parent.parent
+PROMPT = b"Choose an action: "
+
+
+def measure(name: str, op: Callable[[], object], min_time: float, rounds: int, **params: object) -> Result:
+    """Best-of-``rounds`` throughput of ``op``; each round runs for at least ``min_time`` seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed < min_time / 4 else 1 + int(min_time / max(elapsed, 1e-9))
+    best = elapsed / number
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        best = min(best, (time.perf_counter() - start) / number)
+    return {"name": name, "params": params, "seconds_per_op": best, "ops_per_sec": 1.0 / best, "number": number}
+
+
+def _engine(headless: bool, upgrades: tuple = ()) -> GameEngine:
+    engine = GameEngine(headless=headless, rng=random.Random(0))
+    engine.state.cash = 10_000
+    engine.state.owned_upgrades.update(upgrades)
+    return engine
+
+
+def bench_actions(min_time: float, rounds: int) -> List[Result]:
+    """Engine actions from a fixed state; every op restores the snapshot first, which is included."""
+    results = []
+    for headless in (False, True):
+        cases = {
+            "start_shift[bus]": (_engine(headless), lambda engine: engine.start_shift("bus")),
+            "start_shift[car]": (_engine(headless, ("car",)), lambda engine: engine.start_shift("car")),
+            "rest": (_engine(headless), GameEngine.rest),
+            "practice": (_engine(headless), GameEngine.practice),
+            "purchase_upgrade": (_engine(headless), lambda engine: engine.purchase_upgrade("jigger")),
+        }
+        for name, (engine, action) in cases.items():
+            snapshot = engine.snapshot()
+
+            def op(engine=engine, action=action, snapshot=snapshot) -> None:
+                engine.restore(snapshot)
+                action(engine)
+
+            results.append(measure(f"engine.{name}", op, min_time, rounds, headless=headless))
+        engine = _engine(headless)
+        snapshot = engine.snapshot()
+        results.append(measure("engine.restore", lambda: engine.restore(snapshot), min_time, rounds, headless=headless))
+    return results
+
+
+def _noop(outcome: ShiftOutcome) -> None:
+    pass
+
+
+def bench_weighted_choice(min_time: float, rounds: int, sizes: List[int]) -> List[Result]:
+    """``_weighted_choice`` on a prebuilt ``EventTable`` and on a plain list (built per call)."""
+    rng = random.Random(0)
+    engine = GameEngine(headless=True, rng=rng)
+    results = []
+    for size in sizes:
+        events = [ShiftEvent(f"e{index}", "", "", _noop, weight=rng.randint(1, 9)) for index in range(size)]
+        table = EventTable(events)
+        results.append(measure("weighted_choice[table]", lambda: engine._weighted_choice(table), min_time, rounds, events=size))
+        results.append(measure("weighted_choice[list]", lambda: engine._weighted_choice(events), min_time, rounds, events=size))
+    return results
+
+
+def bench_storage(min_time: float, rounds: int, log_sizes: List[int]) -> List[Result]:
+    """``save_state`` then ``load_state`` round trips, then per-turn save cost; the day is bumped so no save is skipped."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for binary in (False, True):
+            for size in log_sizes:
+                state = GameEngine().state
+                state.log_capacity = size
+                state.log = deque((f"Log line {index} of the shift feed." for index in range(size)), maxlen=size)
+                path = Path(directory) / f"bench-{size}-{int(binary)}.sav"
+
+                def op(state=state, path=path, binary=binary) -> None:
+                    state.day += 1
+                    save_state(state, path, binary=binary)
+                    load_state(path)
+
+                results.append(
+                    measure("storage.round_trip", op, min_time, rounds, log_entries=size, binary=binary)
+                )
+        # What a turn pays to save: a full write, or a hand-off to the write-behind saver.
+        state = GameEngine().state
+        path = Path(directory) / "bench-turn.json"
+
+        def save_now() -> None:
+            state.day += 1
+            save_state(state, path)
+
+        results.append(measure("storage.save_per_turn[sync]", save_now, min_time, rounds))
+        saver = WriteBehindSaver(1.0, path)
+
+        def save_behind() -> None:
+            state.day += 1
+            saver.save(state)
+
+        results.append(measure("storage.save_per_turn[write_behind]", save_behind, min_time, rounds))
+        saver.close()
+    return results
+
+
+def _best_wall(name: str, launch: Callable[[], None], rounds: int, **params: object) -> Result:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        launch()
+        best = min(best, time.perf_counter() - start)
+    return {"name": name, "params": params, "seconds_per_op": best, "ops_per_sec": 1.0 / best, "number": 1}
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ, POUR_DECISIONS_HINT_MS="0")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    env.pop("POUR_DECISIONS_PROFILE", None)
+    return env
+
+
+def _import(module: str) -> None:
+    subprocess.run([sys.executable, "-c", f"import {module}"], env=_env(), check=True)
+
+
+def _first_prompt() -> None:
+    """Launch the game and wait until it asks for the first action; nothing is saved."""
+    process = subprocess.Popen(
+        [sys.executable, str(ROOT / "main.py")], stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=_env()
+    )
+    output = b""
+    try:
+        while not output.endswith(PROMPT):
+            chunk = process.stdout.read1(4096)
+            if not chunk:
+                raise RuntimeError("game exited before the first prompt")
+            output += chunk
+    finally:
+        process.kill()
+        process.wait()
+
+
+def _story_events(size: int) -> List[StoryEvent]:
+    choice = StoryChoice("shrug", "Shrug", {"stress": 1}, "Nothing happens.")
+    return [StoryEvent(f"story-{index}", "Title", "Text", [choice], weight=1 + index % 5) for index in range(size)]
+
+
+def bench_startup(min_time: float, rounds: int, sizes: List[int]) -> List[Result]:
+    """Fresh-process import and start-to-first-prompt times, then content index builds by size."""
+    results = [
+        _best_wall("startup.python", lambda: _import("sys"), rounds),
+        _best_wall("startup.import_cli", lambda: _import("pour_decisions.cli"), rounds),
+        _best_wall("startup.first_prompt", _first_prompt, rounds),
+    ]
+    for group in sorted(set(data._TABLE_GROUPS.values()), key=lambda group: group.__name__):
+        results.append(measure(f"data.{group.__name__.strip('_')}", group, min_time, rounds))
+    for size in sizes:
+        events = _story_events(size)
+
+        def build(events=events) -> None:
+            MappingProxyType({event.id: event for event in events})
+            EventTable(events)
+
+        results.append(measure("data.story_event_indexes", build, min_time, rounds, events=size))
+    return results
+
+
+def _pack_document(size: int) -> Dict[str, object]:
+    effects = {"tips": 12, "wage": {"mul": 0.9}, "stress_gain": {"add": -3, "min": 0}}
+    return {
+        "name": f"bench-{size}",
+        "shift_events": [
+            {"id": f"shift-{index}", "title": "Title", "text": "Text", "weight": 1 + index % 5, "effects": effects}
+            for index in range(size)
+        ],
+        "story_events": [
+            {
+                "id": f"story-{index}",
+                "title": "Title",
+                "text": "Text",
+                "choices": [{"id": "shrug", "label": "Shrug", "effects": {"stress": 1}, "note": "Nothing happens."}],
+            }
+            for index in range(size)
+        ],
+    }
+
+
+def bench_content_packs(min_time: float, rounds: int, sizes: List[int]) -> List[Result]:
+    """``load_pack`` on packs of ``size`` shift and story events, parsed and from the compiled cache."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        cache_dir = Path(directory) / "cache"
+        for size in sizes:
+            path = Path(directory) / f"pack-{size}.json"
+            path.write_text(json.dumps(_pack_document(size)))
+            load_pack(path, cache_dir)
+            results.append(measure("content.load_pack[parse]", lambda: load_pack(path, None), min_time, rounds, events=size))
+            results.append(
+                measure("content.load_pack[cached]", lambda: load_pack(path, cache_dir), min_time, rounds, events=size)
+            )
+    return results
+
+
+def bench_export(min_time: float, rounds: int, days: int = 1_000) -> List[Result]:
+    """Trajectory rows per second through each sink, plus generating them with no sink."""
+    records = list(careers(grind_policy, 10, days))
+    results = [
+        measure("export.careers", lambda: sum(1 for _ in careers(grind_policy, 1, days)), min_time, rounds, days=days)
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        for suffix in (".csv", ".jsonl", ".ptraj"):
+            path = Path(directory) / f"bench{suffix}"
+
+            def write(path=path) -> None:
+                with open_sink(path) as sink:
+                    sink.write_all(records)
+
+            results.append(measure(f"export.sink[{suffix[1:]}]", write, min_time, rounds, rows=len(records)))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=Path(__file__).with_name("results.json"))
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="short rounds and fewer sizes, for smoke runs")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.min_time, args.rounds = 0.02, 1
+    sizes = [10, 100, 10_000] if args.quick else [10, 100, 1_000, 10_000]
+
+    results = (
+        bench_actions(args.min_time, args.rounds)
+        + bench_weighted_choice(args.min_time, args.rounds, sizes)
+        + bench_storage(args.min_time, args.rounds, sizes)
+        + bench_startup(args.min_time, args.rounds, sizes)
+        + bench_content_packs(args.min_time, args.rounds, sizes)
+        + bench_export(args.min_time, args.rounds)
+    )
+    for result in results:
+        params = ", ".join(f"{key}={value}" for key, value in result["params"].items())
+        print(f"{result['name']:<28} {params:<32} {result['ops_per_sec']:>14,.0f} ops/s")
+    report = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "min_time": args.min_time,
+        "rounds": args.rounds,
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
 """Neon noir bartender life simulation."""
 
-__all__ = ["cli", "engine", "data", "models", "storage"]
+# ``batch`` and ``solver`` need NumPy (the ``batch`` extra), so they are left out
+# of ``import *``; import them by name.
+__all__ = ["advisor", "analysis", "cli", "content", "engine", "data", "export", "models", "profiling", "server", "sim", "storage"]
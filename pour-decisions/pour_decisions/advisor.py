@@ -0,0 +1,185 @@
+"""Rollout-based action advisor.
+
+Every legal action is scored by applying it to a copy of the state and then
+playing ``policy`` headless for ``horizon`` days; the action with the
+best mean final cash wins. Rollouts run in rounds until the latency budget is
+spent, optionally across an executor, and their statistics are kept in a
+transposition cache keyed on the numeric state so repeat visits start warm.
+"""
+
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Dict, List, Optional, Tuple
+
+from .analysis import action_allowed
+from .data import JOB_INDEX, JOBS, UPGRADES
+from .engine import GameEngine
+from .models import GameState
+from .sim import Policy, grind_policy, perform, run_policy
+
+StateKey = Tuple[object, ...]
+
+
+def state_key(state: GameState) -> StateKey:
+    """Everything that affects future play; day and age do not."""
+    return (
+        state.energy,
+        state.stress,
+        state.cash,
+        state.xp,
+        state.reputation,
+        state.rent_progress,
+        state.job_id,
+        frozenset(state.owned_upgrades),
+    )
+
+
+def legal_actions(state: GameState) -> List[str]:
+    """Actions that would succeed right now, in ``sim.perform`` names."""
+    upgrades = frozenset(state.owned_upgrades)
+    actions = [
+        action
+        for action in ("shift-bus", "shift-car", "rest", "practice")
+        if action_allowed(upgrades, action, state.energy, state.stress)
+        and (action != "shift-car" or "car" in upgrades)
+    ]
+    actions.extend(
+        f"buy:{upgrade.id}"
+        for upgrade in UPGRADES
+        if upgrade.id not in upgrades and state.cash >= upgrade.cost
+    )
+    current = JOB_INDEX.get(state.job_id, 0)
+    actions.extend(
+        f"promote:{job.id}"
+        for job in JOBS[current + 1 :]
+        if state.xp >= job.xp_required
+        and (not job.requires or job.requires in upgrades)
+        and state.cash >= job.entry_fee
+    )
+    return actions
+
+
+def rollouts(state: GameState, action: str, horizon: int, policy: Policy, seeds: List[int]) -> List[int]:
+    """Cash ``horizon`` days out for one rollout per seed: ``action`` first, then ``policy``.
+
+    Rollout engines are never profiled, so a ``--profile`` run counts only the player's own game.
+    """
+    scores = []
+    last_day = state.day + horizon
+    for seed in seeds:
+        rng = random.Random(seed)
+        branch = state.clone()
+        perform(GameEngine(branch, headless=True, rng=rng, profile=False), action)
+        run_policy(policy, last_day - branch.day, branch, rng, profile=False)
+        scores.append(branch.cash)
+    return scores
+
+
+class Advisor:
+    """Suggests an action within a wall-clock budget.
+
+    ``executor`` may be a ``ProcessPoolExecutor`` (or any executor) that
+    outlives the advisor's calls; without one, rollouts run on the calling
+    thread. ``policy`` must be picklable when a process pool is used.
+    """
+
+    def __init__(
+        self,
+        horizon: int = 21,
+        policy: Policy = grind_policy,
+        executor: Optional[Executor] = None,
+        batch: int = 8,
+        max_rollouts: int = 256,
+        cache_size: int = 4096,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.horizon = horizon
+        self.policy = policy
+        self.executor = executor
+        self.batch = batch
+        self.max_rollouts = max_rollouts
+        self.cache_size = cache_size
+        self.rng = random.Random(seed)
+        # state key -> action -> [total score, rollouts]
+        self._cache: "OrderedDict[StateKey, Dict[str, List[int]]]" = OrderedDict()
+
+    def _stats(self, state: GameState, actions: List[str]) -> Dict[str, List[int]]:
+        key = state_key(state)
+        stats = self._cache.get(key)
+        if stats is None:
+            stats = self._cache[key] = {action: [0, 0] for action in actions}
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return stats
+
+    def _seeds(self) -> List[int]:
+        return [self.rng.getrandbits(64) for _ in range(self.batch)]
+
+    def _record(self, stats: Dict[str, List[int]], action: str, scores: List[int]) -> None:
+        totals = stats[action]
+        totals[0] += sum(scores)
+        totals[1] += len(scores)
+
+    def _search_inline(self, state: GameState, stats: Dict[str, List[int]], deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            action = min(stats, key=lambda name: stats[name][1])
+            if stats[action][1] >= self.max_rollouts:
+                return
+            self._record(stats, action, rollouts(state, action, self.horizon, self.policy, self._seeds()))
+
+    def _search_pool(self, state: GameState, stats: Dict[str, List[int]], deadline: float) -> None:
+        pending: Dict[Future, str] = {}
+
+        def submit(action: str) -> None:
+            future = self.executor.submit(rollouts, state, action, self.horizon, self.policy, self._seeds())
+            pending[future] = action
+
+        for action in stats:
+            if stats[action][1] < self.max_rollouts:
+                submit(action)
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                action = pending.pop(future)
+                self._record(stats, action, future.result())
+                if stats[action][1] < self.max_rollouts:
+                    submit(action)
+        for future in pending:
+            future.cancel()
+
+    def suggest(self, state: GameState, budget_ms: float = 50.0) -> str:
+        """Best action for ``state`` found within ``budget_ms`` milliseconds.
+
+        Falls back to ``policy`` when no rollout finished in time.
+        """
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        actions = legal_actions(state)
+        if len(actions) == 1:
+            return actions[0]
+        stats = self._stats(state, actions)
+        if self.executor is None:
+            self._search_inline(state, stats, deadline)
+        else:
+            self._search_pool(state, stats, deadline)
+        scored = [(totals[0] / totals[1], action) for action, totals in stats.items() if totals[1]]
+        if not scored:
+            return self.policy(GameEngine(state, headless=True, profile=False))
+        return max(scored)[1]
+
+
+_default_advisor: Optional[Advisor] = None
+
+
+def default_advisor() -> Advisor:
+    """Process-wide in-thread advisor used by ``GameEngine.suggest_action``."""
+    global _default_advisor
+    if _default_advisor is None:
+        _default_advisor = Advisor()
+    return _default_advisor
@@ -0,0 +1,414 @@
+"""Exact expectations and discretized Markov-chain forecasts for careers.
+
+``shift_distribution`` enumerates every wage, tip, commute and shift-event
+branch of ``GameEngine.start_shift`` (running the real event callables) and
+returns the exact outcome distribution. ``CareerChain.forecast`` pushes a
+probability distribution over career states through a policy day by day,
+which gives expected cash, eviction probability and promotion timing without
+sampling.
+
+Story events are left out: they depend on player choices.
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from .data import JOB_INDEX, JOBS, SHIFT_EVENT_TABLE, UPGRADE_REGISTRY, initial_state
+from .engine import clamp
+from .models import NO_FLOOR, OUTCOME_FIELDS, GameState, ShiftEvent, ShiftOutcome
+
+
+class ShiftResult(NamedTuple):
+    earnings: int
+    energy_cost: int
+    stress_gain: int
+    xp_gain: int
+    reputation_gain: int
+
+
+def _uniform(low: int, high: int) -> Dict[int, float]:
+    p = 1.0 / (high - low + 1)
+    return {value: p for value in range(low, high + 1)}
+
+
+def _commute_branches(mode: str, has_car: bool) -> List[Tuple[float, bool, int, Dict[int, float]]]:
+    """(probability, late, stress delta, commute cash distribution) per branch."""
+    if mode == "car" and not has_car:
+        return [(1.0, False, 0, {0: 1.0})]
+    if mode == "bus":
+        return [
+            (0.35 * 0.25, True, 7, {0: 1.0}),
+            (0.35 * 0.75, True, 3, {0: 1.0}),
+            (0.65 * 0.25, False, 7, {0: 1.0}),
+            (0.65 * 0.75, False, 3, {0: 1.0}),
+        ]
+    repair = {-cost: p for cost, p in _uniform(35, 60).items()}
+    return [
+        (0.18 * 0.4, True, 16, repair),
+        (0.18 * 0.6, False, 16, repair),
+        (0.82 * 0.3 * 0.22, True, 10, {0: 1.0}),
+        (0.82 * 0.3 * 0.78, False, 10, {0: 1.0}),
+        (0.82 * 0.7, False, 2, {0: 1.0}),
+    ]
+
+
+def _adds_to_cash(event: ShiftEvent) -> bool:
+    """Whether ``event`` changes ``cash_change`` only by a constant, if at all."""
+    if event.effect is None:
+        return False
+    slot = OUTCOME_FIELDS.index("cash_change")
+    return event.effect.factor[slot] == 1 and event.effect.floor[slot] == NO_FLOOR
+
+
+@lru_cache(maxsize=None)
+def shift_distribution(
+    job_index: int,
+    upgrades: FrozenSet[str] = frozenset(),
+    commute_mode: str = "bus",
+) -> Dict[ShiftResult, float]:
+    """Exact distribution of one worked shift for a job, upgrade set and commute.
+
+    Events that only add to ``cash_change`` run once with the commute's cash
+    at zero and the commute cash is added afterwards. Events that scale or
+    floor it, or that are given as arbitrary callables, run once per commute
+    cash value instead.
+    """
+    job = JOBS[job_index]
+    effects = UPGRADE_REGISTRY.effects(UPGRADE_REGISTRY.mask(upgrades))
+    energy_cost = 22 + job_index * 2 + effects.get("energy_cost", 0)
+    base_stress = 14 + job_index * 2 + effects.get("stress_gain", 0)
+    base_xp = 22 + job_index * 6 + effects.get("xp_bonus", 0)
+    reputation_gain = effects.get("reputation_bonus", 0)
+    tip_bonus = effects.get("tip_bonus", 0)
+    wages = _uniform(job.pay_range[0], job.pay_range[1])
+    tips = {value + tip_bonus: p for value, p in _uniform(14, 38).items()}
+    events = [
+        (event, event.weight / SHIFT_EVENT_TABLE.total, _adds_to_cash(event))
+        for event in SHIFT_EVENT_TABLE.events
+        if event.weight > 0
+    ]
+
+    scratch = ShiftOutcome(0, 0, 0, 0, 0)
+    after_event: Dict[Tuple[int, ...], ShiftResult] = {}
+    result: Dict[ShiftResult, float] = {}
+
+    def add(key: ShiftResult, p: float) -> None:
+        result[key] = result.get(key, 0.0) + p
+
+    def apply(event, wage: int, tip: int, stress_gain: int, xp_gain: int, cash: int) -> ShiftResult:
+        cache_key = (id(event), wage, tip, stress_gain, xp_gain, cash)
+        applied = after_event.get(cache_key)
+        if applied is None:
+            scratch.reset(wage, tip, energy_cost, stress_gain, xp_gain, reputation_gain, cash)
+            event.apply(scratch)
+            applied = after_event[cache_key] = ShiftResult(
+                max(0, scratch.wage) + max(0, scratch.tips) + scratch.cash_change,
+                max(8, scratch.energy_cost),
+                max(0, scratch.stress_gain),
+                max(8, scratch.xp_gain),
+                reputation_gain + scratch.reputation_gain,
+            )
+        return applied
+
+    for p_commute, late, commute_stress, commute_cash in _commute_branches(
+        commute_mode, "car" in upgrades
+    ):
+        stress_gain = base_stress + commute_stress
+        xp_gain = max(6, base_xp - 4) if late else base_xp
+        pre: Dict[Tuple[int, int], float] = {}
+        for wage, p_wage in wages.items():
+            for tip, p_tip in tips.items():
+                if late:
+                    key = (max(0, int(wage * 0.85)), max(0, int(tip * 0.25)))
+                else:
+                    key = (wage, tip)
+                pre[key] = pre.get(key, 0.0) + p_wage * p_tip
+
+        for (wage, tip), p_pay in pre.items():
+            p_base = p_commute * p_pay
+            for cash, p_cash in commute_cash.items():
+                add(ShiftResult(wage + tip + cash, energy_cost, stress_gain, xp_gain, reputation_gain), p_base * p_cash * 0.45)
+            for event, p_event, additive in events:
+                p = p_base * 0.55 * p_event
+                if additive:
+                    applied = apply(event, wage, tip, stress_gain, xp_gain, 0)
+                    for cash, p_cash in commute_cash.items():
+                        add(applied._replace(earnings=applied.earnings + cash), p * p_cash)
+                else:
+                    for cash, p_cash in commute_cash.items():
+                        add(apply(event, wage, tip, stress_gain, xp_gain, cash), p * p_cash)
+    return result
+
+
+def expected_shift(
+    job_index: int,
+    upgrades: FrozenSet[str] = frozenset(),
+    commute_mode: str = "bus",
+) -> ShiftResult:
+    """Expected value of every ``ShiftResult`` field, as floats."""
+    totals = [0.0] * len(ShiftResult._fields)
+    for outcome, p in shift_distribution(job_index, frozenset(upgrades), commute_mode).items():
+        for index, value in enumerate(outcome):
+            totals[index] += value * p
+    return ShiftResult(*totals)
+
+
+DAY_ACTIONS = ("shift-bus", "shift-car", "rest", "practice")
+
+
+def day_distribution(
+    job_index: int,
+    upgrades: FrozenSet[str],
+    action: str,
+) -> Dict[ShiftResult, float]:
+    """Outcome distribution of one day-advancing action from ``DAY_ACTIONS``.
+
+    Rest and practice are deterministic; rest reports its energy and stress
+    recovery as a negative ``energy_cost`` and ``stress_gain``.
+    """
+    if action.startswith("shift-"):
+        return shift_distribution(job_index, upgrades, action[6:])
+    effects = UPGRADE_REGISTRY.effects(UPGRADE_REGISTRY.mask(upgrades))
+    if action == "rest":
+        sleep_bonus = effects.get("sleep_bonus", 0)
+        return {ShiftResult(0, -(42 + sleep_bonus), -(20 + max(0, sleep_bonus // 3)), 0, 0): 1.0}
+    if action == "practice":
+        return {
+            ShiftResult(
+                -12,
+                max(10, 20 + effects.get("energy_cost", 0)),
+                max(0, 6 + effects.get("stress_gain", 0)),
+                48 + effects.get("xp_bonus", 0),
+                6 + effects.get("reputation_bonus", 0),
+            ): 1.0
+        }
+    raise ValueError(f"Unknown action: {action}")
+
+
+def rent_increment(upgrades: FrozenSet[str], action: str) -> int:
+    """Rent progress added by one day of ``action``."""
+    rent_slow = UPGRADE_REGISTRY.effects(UPGRADE_REGISTRY.mask(upgrades)).get("rent_slow", 0)
+    if action == "rest":
+        return max(4, 6 + rent_slow)
+    if action == "practice":
+        return max(6, 10 + rent_slow)
+    return max(6, 14 + rent_slow)
+
+
+def action_allowed(upgrades: FrozenSet[str], action: str, energy: int, stress: int) -> bool:
+    """Whether ``action`` advances the day at these vitals (``GameEngine`` refuses otherwise)."""
+    if action.startswith("shift-"):
+        return energy >= 15 and stress <= 95
+    if action == "practice":
+        effects = UPGRADE_REGISTRY.effects(UPGRADE_REGISTRY.mask(upgrades))
+        return energy >= max(10, 20 + effects.get("energy_cost", 0))
+    return True
+
+
+class ChainState(NamedTuple):
+    """One cell of the career chain.
+
+    The first five fields are the discrete state; ``cash`` and ``xp`` are the
+    mean over every career in the cell.
+    """
+
+    energy: int
+    stress: int
+    rent_progress: int
+    job: int
+    evicted: bool
+    cash: float
+    xp: float
+
+
+ChainPolicy = Callable[[ChainState], str]
+
+
+def grind_chain_policy(state: ChainState) -> str:
+    """``sim.grind_policy`` over chain states (bus commute)."""
+    if state.energy < 30 or state.stress > 80:
+        return "rest"
+    return "shift-bus"
+
+
+@dataclass
+class Forecast:
+    days: int
+    expected_cash: List[float] = field(default_factory=list)
+    expected_xp: List[float] = field(default_factory=list)
+    eviction_probability: List[float] = field(default_factory=list)
+    reached_probability: List[float] = field(default_factory=list)
+    # P(T = 0): the career already holds the target job on day zero.
+    reached_at_start: float = 0.0
+    states: int = 0
+
+    @property
+    def expected_days_to_target(self) -> Optional[float]:
+        """Mean days to reach the target job, or None if it may not be reached in the horizon."""
+        reached = self.reached_probability[-1] if self.reached_probability else self.reached_at_start
+        if reached < 1.0 - 1e-6:
+            return None
+        # E[T] = sum over k >= 0 of P(T > k); reached_probability[t] = P(T <= t + 1).
+        return (1.0 - self.reached_at_start) + sum(1.0 - p for p in self.reached_probability)
+
+
+def _quantize(value: int, step: int) -> Iterable[Tuple[int, float]]:
+    """Split ``value`` between its two neighbouring multiples of ``step``, preserving the mean."""
+    low = value - value % step
+    fraction = (value - low) / step
+    if fraction == 0:
+        return ((low, 1.0),)
+    return ((low, 1.0 - fraction), (low + step, fraction))
+
+
+# (energy delta, stress delta), probability, mean cash delta, mean xp delta
+Outcome = Tuple[Tuple[int, int], float, float, float]
+
+
+class CareerChain:
+    """Day-by-day transition model of the engine over discretized states.
+
+    Energy, stress, rent progress, job and eviction are tracked as a
+    distribution; energy and stress deltas are split between the two nearest
+    multiples of ``vital_step`` so their means are preserved (a step of 1 is
+    exact). Cash and XP are carried as the mean of each cell, so rent,
+    eviction and promotion checks use a cell's mean cash and XP rather than
+    its spread. Promotions happen automatically (next rung, as soon as it is
+    affordable) when ``auto_promote`` is set.
+    """
+
+    def __init__(
+        self,
+        upgrades: Iterable[str] = (),
+        vital_step: int = 5,
+        auto_promote: bool = True,
+    ) -> None:
+        self.upgrades = frozenset(upgrades)
+        self.vital_step = vital_step
+        self.auto_promote = auto_promote
+        self._outcome_cache: Dict[Tuple[int, str], List[Outcome]] = {}
+
+    def initial(self, state: Optional[GameState] = None) -> ChainState:
+        """Chain state for ``state`` (default: a new career), vitals rounded down onto the grid."""
+        state = state or initial_state()
+        step = self.vital_step
+        return ChainState(
+            energy=state.energy - state.energy % step,
+            stress=state.stress - state.stress % step,
+            rent_progress=state.rent_progress,
+            job=JOB_INDEX.get(state.job_id, 0),
+            evicted=False,
+            cash=float(state.cash),
+            xp=float(state.xp),
+        )
+
+    def _outcomes(self, job: int, action: str) -> List[Outcome]:
+        """Grid-snapped vitals deltas of ``action`` for ``job``, with mean cash and XP per branch."""
+        key = (job, action)
+        outcomes = self._outcome_cache.get(key)
+        if outcomes is not None:
+            return outcomes
+        exact = [
+            ((result.earnings, -result.energy_cost, result.stress_gain, result.xp_gain), p)
+            for result, p in day_distribution(job, self.upgrades, action).items()
+        ]
+        merged: Dict[Tuple[int, int], List[float]] = {}
+        for (cash, energy, stress, xp), p in exact:
+            for snapped_energy, p_energy in _quantize(energy, self.vital_step):
+                for snapped_stress, p_stress in _quantize(stress, self.vital_step):
+                    q = p * p_energy * p_stress
+                    totals = merged.setdefault((snapped_energy, snapped_stress), [0.0, 0.0, 0.0])
+                    totals[0] += q
+                    totals[1] += q * cash
+                    totals[2] += q * xp
+        outcomes = self._outcome_cache[key] = [
+            (vitals, p, cash / p, xp / p) for vitals, (p, cash, xp) in merged.items()
+        ]
+        return outcomes
+
+    def _end_day(self, state: ChainState, increment: int) -> ChainState:
+        rent_progress = state.rent_progress + max(0, increment)
+        cash, job, evicted = state.cash, state.job, state.evicted
+        rent_due = JOBS[job].rent
+        while rent_progress >= 100:
+            if cash >= rent_due:
+                cash -= rent_due
+                rent_progress -= 100
+            else:
+                cash, rent_progress, job, evicted = 0.0, 0, 0, True
+                break
+        if self.auto_promote and job + 1 < len(JOBS):
+            target = JOBS[job + 1]
+            if (
+                state.xp >= target.xp_required
+                and (not target.requires or target.requires in self.upgrades)
+                and cash >= target.entry_fee
+            ):
+                cash -= target.entry_fee
+                job += 1
+        return state._replace(rent_progress=rent_progress, cash=cash, job=job, evicted=evicted)
+
+    def transitions(self, state: ChainState, action: str) -> List[Tuple[ChainState, float]]:
+        """Next-day states and probabilities; blocked actions fall back to rest like ``sim.run_policy``."""
+        if not action_allowed(self.upgrades, action, state.energy, state.stress):
+            action = "rest"
+        increment = rent_increment(self.upgrades, action)
+        result = []
+        for (energy, stress), p, cash, xp in self._outcomes(state.job, action):
+            after = state._replace(
+                energy=clamp(state.energy + energy, 0, 120),
+                stress=clamp(state.stress + stress, 0, 140),
+                cash=state.cash + cash,
+                xp=max(0.0, state.xp + xp),
+            )
+            result.append((self._end_day(after, increment), p))
+        return result
+
+    def forecast(
+        self,
+        policy: ChainPolicy,
+        days: int,
+        state: Optional[GameState] = None,
+        target_job: Optional[str] = None,
+        prune: float = 1e-12,
+    ) -> Forecast:
+        """Propagate the state distribution for ``days`` days under ``policy``.
+
+        With ``target_job``, careers that reach it are absorbed and
+        ``reached_probability[t]`` is the chance of having reached it by day
+        ``t + 1``; the other per-day figures then only cover careers not yet
+        absorbed. Branches below ``prune`` probability are dropped.
+        """
+        target = JOB_INDEX[target_job] if target_job else None
+        forecast = Forecast(days=days)
+        distribution: List[Tuple[ChainState, float]] = [(self.initial(state), 1.0)]
+        reached = 0.0
+        if target is not None and distribution[0][0].job >= target:
+            distribution, reached = [], 1.0
+            forecast.reached_at_start = 1.0
+        for _ in range(days):
+            # Discrete cell -> [probability, probability-weighted cash, probability-weighted xp]
+            cells: Dict[tuple, List[float]] = {}
+            for current, p_state in distribution:
+                for after, p in self.transitions(current, policy(current)):
+                    p *= p_state
+                    if p < prune:
+                        continue
+                    if target is not None and after.job >= target:
+                        reached += p
+                        continue
+                    totals = cells.get(after[:5])
+                    if totals is None:
+                        cells[after[:5]] = [p, p * after.cash, p * after.xp]
+                    else:
+                        totals[0] += p
+                        totals[1] += p * after.cash
+                        totals[2] += p * after.xp
+            distribution = [(ChainState(*cell, cash / p, xp / p), p) for cell, (p, cash, xp) in cells.items()]
+            forecast.states = max(forecast.states, len(distribution))
+            forecast.expected_cash.append(sum(s.cash * p for s, p in distribution))
+            forecast.expected_xp.append(sum(s.xp * p for s, p in distribution))
+            forecast.eviction_probability.append(sum(p for s, p in distribution if s.evicted))
+            forecast.reached_probability.append(reached)
+        return forecast
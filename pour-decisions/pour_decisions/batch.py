@@ -0,0 +1,370 @@
+"""Struct-of-arrays engine that advances many careers in lockstep.
+
+Requires NumPy (``pip install pour-decisions[batch]``). Every rule mirrors the
+scalar ``GameEngine`` so the two can be checked against each other; only the
+narrative side (messages, log, story events) is left out.
+
+Randomness is drawn as 16-bit lanes, so the batch engine matches the scalar
+one in distribution, not draw for draw: every chance, every ``randint``
+value and every shift event's odds are within 2**-16 of the scalar engine's.
+Means agree to within sampling error (see ``tests/test_batch.py``).
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .data import JOB_INDEX, JOBS, SHIFT_EVENT_TABLE, SHIFT_EVENTS, UPGRADES, initial_state
+from .models import NO_FLOOR, OUTCOME_FIELDS, GameState, ShiftOutcome
+
+UPGRADE_INDEX = {upgrade.id: index for index, upgrade in enumerate(UPGRADES)}
+EFFECT_KEYS = tuple(sorted({key for upgrade in UPGRADES for key in upgrade.effects}))
+
+# Per-shift quantities are small, so ``start_shift`` works in 32 bits and only
+# the state arrays are 64-bit; tables that would not fit stay 64-bit.
+_INT32 = np.iinfo(np.int32)
+
+
+def _narrow(values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.int64)
+    fits = values.size == 0 or (values.min() >= _INT32.min and values.max() <= _INT32.max)
+    return values.astype(np.int32) if fits else values
+
+
+_PAY_LOW = _narrow([job.pay_range[0] for job in JOBS])
+_PAY_SPAN = _narrow([job.pay_range[1] - job.pay_range[0] + 1 for job in JOBS])
+_RENT = np.array([job.rent for job in JOBS], dtype=np.int64)
+_UPGRADE_EFFECTS = np.array(
+    [[upgrade.effects.get(key, 0) for key in EFFECT_KEYS] for upgrade in UPGRADES],
+    dtype=np.int64,
+).reshape(len(UPGRADES), len(EFFECT_KEYS))
+
+
+# Floors ``start_shift`` applies to every field after an event fires. They are
+# folded into each event's own floor since max() nests.
+_POST_EVENT_FLOOR = {"wage": 0, "tips": 0, "energy_cost": 8, "stress_gain": 0, "xp_gain": 8}
+
+# Each shift draws eight 16-bit uniforms per career out of four raw 64-bit
+# words; probabilities become integer thresholds and ``randint`` a multiply
+# and shift, which is exact to within 2**-16.
+_LANES = 8
+_U_WAGE, _U_TIPS, _U_COMMUTE, _U_COMMUTE_EXTRA, _U_CAR_LATE, _U_REPAIR, _U_EVENT, _U_SPARE = range(_LANES)
+_ONE = 1 << 16
+_EVENT_CHANCE = 0.55
+
+
+def _threshold(probability: float) -> int:
+    return round(probability * _ONE)
+
+
+def _randint(lane: np.ndarray, low, span) -> np.ndarray:
+    return low + ((lane * span) >> 16)
+
+
+class _EventColumns:
+    """Per-field event effects for ``start_shift``, compiled once per content table.
+
+    Row ``e`` of every table is event ``e``; the extra last row is "no event".
+    Each field keeps only the tables some event needs: an integer or float
+    ``scale``, a ``delta`` and a ``floor``. The no-event row's reputation
+    scale is zero because the scalar engine only adds the outcome's
+    reputation total (base bonus included) when an event fires. Events
+    without a compiled effect are applied one by one through their callable.
+    """
+
+    def __init__(self, table) -> None:
+        events = table.events
+        count = len(events)
+        shape = (count + 1, len(OUTCOME_FIELDS))
+        factor = np.ones(shape, dtype=np.float64)
+        delta = np.zeros(shape, dtype=np.int64)
+        floor = np.full(shape, NO_FLOOR, dtype=np.int64)
+        self.scalar = np.zeros(count + 1, dtype=bool)
+        for row, event in enumerate(events):
+            if event.effect is None:
+                self.scalar[row] = True
+            else:
+                factor[row], delta[row], floor[row] = event.effect.factor, event.effect.delta, event.effect.floor
+        post = np.array([_POST_EVENT_FLOOR.get(field, NO_FLOOR) for field in OUTCOME_FIELDS], dtype=np.int64)
+        floor[:-1] = np.maximum(floor[:-1], post)
+        factor[-1, OUTCOME_FIELDS.index("reputation_gain")] = 0
+        self.any_scalar = bool(self.scalar.any())
+        self.no_event = count
+
+        # (field index, scale or None, delta or None, floor or None)
+        self.fields = []
+        for index in range(len(OUTCOME_FIELDS)):
+            scale = factor[:, index]
+            if (scale == 1).all():
+                scale = None
+            elif (scale == np.round(scale)).all():
+                scale = _narrow(scale)  # int(x * f) == x * f for integer factors
+            shift = _narrow(delta[:, index]) if delta[:, index].any() else None
+            low = None
+            if (floor[:, index] > NO_FLOOR).any():
+                low = _narrow(np.maximum(floor[:, index], _INT32.min))
+            self.fields.append((index, scale, shift, low))
+
+        # One 16-bit lane picks the event: the first 55% of the range maps onto
+        # events in proportion to their weights, the rest is "no event". With a
+        # total weight too large for 16 bits to split fairly, fall back to a
+        # float draw and a binary search.
+        weights = np.array([event.weight for event in events], dtype=np.float64)
+        self.cumulative = np.cumsum(weights)
+        total = float(self.cumulative[-1]) if count else 0.0
+        fired = _threshold(_EVENT_CHANCE)
+        self.lookup: Optional[np.ndarray] = None
+        if count and total and (weights == np.round(weights)).all() and total <= fired // 256:
+            slots = np.arange(_ONE)
+            picks = np.searchsorted(self.cumulative, (slots[:fired] + 0.5) * total / fired)
+            self.lookup = np.concatenate([np.minimum(picks, count - 1), np.full(_ONE - fired, count)])
+            self.lookup = self.lookup.astype(np.min_scalar_type(count))
+        self.fired = fired
+        self.total = total
+
+    def pick(self, lane: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        if self.lookup is not None:
+            # Gathering small codes and widening once beats gathering intp.
+            return self.lookup.take(lane).astype(np.intp)
+        if not self.total:
+            return np.full(len(lane), self.no_event, dtype=np.intp)
+        picks = np.searchsorted(self.cumulative, rng.random(len(lane)) * self.total)
+        return np.where(lane < self.fired, np.minimum(picks, self.no_event - 1), self.no_event)
+
+
+_EVENTS = _EventColumns(SHIFT_EVENT_TABLE)
+_LATE_BUS = _threshold(0.35)
+_BUS_EXTRA = _threshold(0.25)
+_BREAKDOWN = _threshold(0.18)
+_TRAFFIC = _threshold(0.3)
+_LATE_BREAKDOWN = _threshold(0.4)
+_LATE_TRAFFIC = _threshold(0.22)
+_BLOCK = 1 << 15
+
+
+class BatchEngine:
+    def __init__(self, states: Sequence[GameState], seed: Optional[int] = None) -> None:
+        self.rng = np.random.default_rng(seed)
+        self.day = np.array([state.day for state in states], dtype=np.int64)
+        self.age = np.array([state.age for state in states], dtype=np.int64)
+        self.energy = np.array([state.energy for state in states], dtype=np.int64)
+        self.stress = np.array([state.stress for state in states], dtype=np.int64)
+        self.cash = np.array([state.cash for state in states], dtype=np.int64)
+        self.xp = np.array([state.xp for state in states], dtype=np.int64)
+        self.reputation = np.array([state.reputation for state in states], dtype=np.int64)
+        self.rent_progress = np.array([state.rent_progress for state in states], dtype=np.int64)
+        self.job = np.array([JOB_INDEX.get(state.job_id, 0) for state in states], dtype=np.int64)
+        self.owned = np.zeros((len(states), len(UPGRADES)), dtype=bool)
+        for row, state in enumerate(states):
+            for upgrade_id in state.owned_upgrades:
+                if upgrade_id in UPGRADE_INDEX:
+                    self.owned[row, UPGRADE_INDEX[upgrade_id]] = True
+        self.refresh_effects()
+
+    @classmethod
+    def replicate(cls, count: int, state: Optional[GameState] = None, seed: Optional[int] = None) -> "BatchEngine":
+        return cls([state or initial_state()] * count, seed=seed)
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    def refresh_effects(self) -> None:
+        """Recompute per-career upgrade totals after changing ``owned``."""
+        self.effects = self.owned.astype(np.int64) @ _UPGRADE_EFFECTS
+        # Contiguous per-key copies; the hot paths read one key at a time.
+        self._effects = {key: _narrow(self.effects[:, index]) for index, key in enumerate(EFFECT_KEYS)}
+
+    def _effect(self, key: str, block: slice = slice(None)) -> np.ndarray:
+        if key not in self._effects:
+            return np.zeros(len(self.day[block]), dtype=np.int32)
+        return self._effects[key][block]
+
+    def _blocks(self):
+        # Blocks keep per-action temporaries cache-resident however many careers there are.
+        return (slice(start, start + _BLOCK) for start in range(0, len(self), _BLOCK))
+
+    def _rows(self, rows: Optional[np.ndarray]) -> np.ndarray:
+        if rows is None:
+            return np.ones(len(self), dtype=bool)
+        return np.asarray(rows, dtype=bool)
+
+    def state(self, row: int) -> GameState:
+        return GameState(
+            day=int(self.day[row]),
+            age=int(self.age[row]),
+            energy=int(self.energy[row]),
+            stress=int(self.stress[row]),
+            cash=int(self.cash[row]),
+            xp=int(self.xp[row]),
+            reputation=int(self.reputation[row]),
+            rent_progress=int(self.rent_progress[row]),
+            job_id=JOBS[int(self.job[row])].id,
+            owned_upgrades={UPGRADES[index].id for index in np.flatnonzero(self.owned[row])},
+        )
+
+    def states(self) -> List[GameState]:
+        return [self.state(row) for row in range(len(self))]
+
+    def _draw(self, count: int) -> np.ndarray:
+        # Eight 16-bit lanes per career; row ``i`` of the result is lane ``i``.
+        return self.rng.bit_generator.random_raw(2 * count).view(np.uint16).reshape(_LANES, count)
+
+    def _resolve_commute(self, lanes: np.ndarray, car: Optional[np.ndarray], block: slice):
+        bus_late = lanes[_U_COMMUTE] < _LATE_BUS
+        bus_stress = 3 + 4 * (lanes[_U_COMMUTE_EXTRA] < _BUS_EXTRA)
+        if car is None or not car.any():
+            return bus_late, bus_stress, None
+
+        has_car = self.owned[block, UPGRADE_INDEX["car"]] if "car" in UPGRADE_INDEX else np.zeros_like(car)
+        # A car commute without a car costs nothing and is never late in the scalar engine.
+        bus = ~car
+        car = car & has_car
+        breakdown = car & (lanes[_U_COMMUTE] < _BREAKDOWN)
+        traffic = car & ~breakdown & (lanes[_U_COMMUTE_EXTRA] < _TRAFFIC)
+        car_late = lanes[_U_CAR_LATE]
+        late = (bus & bus_late) | (breakdown & (car_late < _LATE_BREAKDOWN)) | (traffic & (car_late < _LATE_TRAFFIC))
+        stress = bus * bus_stress + car * (2 + 14 * breakdown + 8 * traffic)
+        cash = -_randint(lanes[_U_REPAIR], np.int32(35), np.int32(26)) * breakdown
+        return late, stress, cash
+
+    def _apply_rent_pressure(self, block: slice = slice(None)) -> None:
+        cash, rent_progress, job = self.cash[block], self.rent_progress[block], self.job[block]
+        while True:
+            due = rent_progress >= 100
+            if not due.any():
+                return
+            rent = _RENT[job]
+            pay = due & (cash >= rent)
+            keep = ~(due & ~pay)
+            cash -= rent * pay
+            cash *= keep
+            rent_progress -= 100 * pay
+            rent_progress *= keep
+            job *= keep
+
+    def _advance_day(self, rows: np.ndarray, rent_increment: np.ndarray, block: slice = slice(None)) -> None:
+        day = self.day[block]
+        day += rows
+        self.rent_progress[block] += np.maximum(0, rent_increment) * rows
+        self._apply_rent_pressure(block)
+        # Birthdays are rare; skip the modulo unless some day just reached a multiple of 365.
+        if len(day) and day.max() // 365 * 365 >= day.min():
+            self.age[block] += rows & (day % 365 == 0)
+
+    def start_shift(self, rows: Optional[np.ndarray] = None, car: Optional[np.ndarray] = None) -> np.ndarray:
+        """Work a shift for ``rows`` (all careers by default).
+
+        ``car`` marks the rows commuting by car. Returns the mask of rows that
+        actually worked and advanced a day.
+        """
+        rows = self._rows(rows) & (self.energy >= 15) & (self.stress <= 95)
+        car = None if car is None else np.asarray(car, dtype=bool)
+        for block in self._blocks():
+            self._shift_block(block, rows[block], None if car is None else car[block])
+        return rows
+
+    def _shift_block(self, block: slice, rows: np.ndarray, car: Optional[np.ndarray]) -> None:
+        lanes = self._draw(len(rows))
+        job = self.job[block]
+        zeros = np.zeros(len(rows), dtype=np.int32)
+        effects = self._effects
+
+        def effect(key: str) -> np.ndarray:
+            return effects[key][block] if key in effects else zeros
+
+        step = 2 * job.astype(np.int32)
+
+        wage = _randint(lanes[_U_WAGE], _PAY_LOW[job], _PAY_SPAN[job])
+        tips = _randint(lanes[_U_TIPS], np.int32(14), np.int32(25)) + effect("tip_bonus")
+        energy_cost = 22 + step + effect("energy_cost")
+        stress_gain = 14 + step + effect("stress_gain")
+        xp_gain = 22 + 3 * step + effect("xp_bonus")
+        reputation_gain = effect("reputation_bonus")
+
+        late, commute_stress, cash_change = self._resolve_commute(lanes, car, block)
+        if cash_change is None:
+            cash_change = zeros
+        stress_gain = stress_gain + commute_stress
+        # Late rows get the scalar engine's cuts; max(0, int(tips * 0.25)) is max(0, tips >> 2).
+        tips = tips + (np.maximum(0, tips >> 2) - tips) * late
+        wage = wage + (np.maximum(0, (wage * 0.85).astype(wage.dtype)) - wage) * late
+        xp_gain = xp_gain + (np.maximum(6, xp_gain - 4) - xp_gain) * late
+
+        picks = _EVENTS.pick(lanes[_U_EVENT], self.rng)
+        outcome = [wage, tips, energy_cost, stress_gain, xp_gain, reputation_gain, cash_change]
+        applied = list(outcome)
+        for index, scale, shift, low in _EVENTS.fields:
+            value = applied[index]
+            if scale is not None:
+                factor = scale.take(picks)
+                value = value * factor if factor.dtype.kind == "i" else (value * factor).astype(value.dtype)
+            if shift is not None:
+                value = value + shift.take(picks)
+            if low is not None:
+                value = np.maximum(low.take(picks), value)
+            applied[index] = value
+        scalar_rows = np.flatnonzero(rows & _EVENTS.scalar[picks]) if _EVENTS.any_scalar else ()
+        if len(scalar_rows):
+            # Copies: untouched fields may still alias shared effect columns.
+            applied = [np.array(value, dtype=np.int64) for value in applied]
+            for row in scalar_rows:
+                scalar = ShiftOutcome(*(int(value[row]) for value in outcome))
+                SHIFT_EVENTS[picks[row]].apply(scalar)
+                for index, field in enumerate(OUTCOME_FIELDS):
+                    applied[index][row] = max(_POST_EVENT_FLOOR.get(field, NO_FLOOR), getattr(scalar, field))
+        wage, tips, energy_cost, stress_gain, xp_gain, event_reputation, cash_change = applied
+        reputation_gain = reputation_gain + event_reputation
+
+        self.cash[block] += (wage + tips + cash_change) * rows
+        energy, stress, xp, reputation = self.energy[block], self.stress[block], self.xp[block], self.reputation[block]
+        energy -= energy_cost * rows
+        np.clip(energy, 0, 120, out=energy)
+        stress += stress_gain * rows
+        np.clip(stress, 0, 140, out=stress)
+        xp += xp_gain * rows
+        np.maximum(xp, 0, out=xp)
+        reputation += reputation_gain * rows
+        np.clip(reputation, 0, 150, out=reputation)
+
+        rent_increment = np.maximum(6, 14 + effect("rent_slow"))
+        self._advance_day(rows, rent_increment, block)
+
+    def rest(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        rows = self._rows(rows)
+        for block in self._blocks():
+            self._rest_block(block, rows[block])
+        return rows
+
+    def _rest_block(self, block: slice, rows: np.ndarray) -> None:
+        sleep_bonus = self._effect("sleep_bonus", block)
+        energy, stress = self.energy[block], self.stress[block]
+        energy += (42 + sleep_bonus) * rows
+        np.clip(energy, 0, 120, out=energy)
+        stress -= (20 + np.maximum(0, sleep_bonus // 3)) * rows
+        np.clip(stress, 0, 140, out=stress)
+
+        self._advance_day(rows, np.maximum(4, 6 + self._effect("rent_slow", block)), block)
+
+    def practice(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        rows = np.array(self._rows(rows), dtype=bool)
+        for block in self._blocks():
+            self._practice_block(block, rows[block])
+        return rows
+
+    def _practice_block(self, block: slice, rows: np.ndarray) -> None:
+        # ``rows`` is a view, so dropping the rows too tired to practise updates the caller's mask.
+        energy_cost = np.maximum(10, 20 + self._effect("energy_cost", block))
+        energy, stress = self.energy[block], self.stress[block]
+        rows &= energy >= energy_cost
+
+        energy -= energy_cost * rows
+        np.clip(energy, 0, 120, out=energy)
+        stress += np.maximum(0, 6 + self._effect("stress_gain", block)) * rows
+        np.clip(stress, 0, 140, out=stress)
+        self.cash[block] -= 12 * rows
+        self.xp[block] += (48 + self._effect("xp_bonus", block)) * rows
+        reputation = self.reputation[block]
+        reputation += (6 + self._effect("reputation_bonus", block)) * rows
+        np.clip(reputation, 0, 150, out=reputation)
+
+        self._advance_day(rows, np.maximum(6, 10 + self._effect("rent_slow", block)), block)
@@ -1,9 +1,21 @@
+import argparse
 import sys
 import textwrap
+from typing import List, Optional
 
-from .data import JOBS, UPGRADES
+from . import data, profiling
 from .engine import GameEngine
-from .storage import load_state, save_state
+from .storage import Journal, WriteBehindSaver, load_state
+
+# Default wall-clock budget for the advisor hint that ``--hint`` shows each turn.
+HINT_BUDGET_MS = 40.0
+
+ACTION_LABELS = {
+    "shift-bus": "Work a shift (bus)",
+    "shift-car": "Work a shift (car)",
+    "rest": "Rest and reset",
+    "practice": "Practice recipes and speed",
+}
 
 
 def _format_money(value: int) -> str:
@@ -19,7 +31,7 @@ def _print_status(engine: GameEngine) -> None:
     state = engine.state
     job = engine.current_job
     upgrades = ", ".join(
-        up.name for up in UPGRADES if up.id in state.owned_upgrades
+        up.name for up in data.UPGRADES if up.id in state.owned_upgrades
     ) or "None"
     print(f"Day {state.day} | Age {state.age} | Role: {job.title}")
     print(
@@ -31,6 +43,15 @@ def _print_status(engine: GameEngine) -> None:
     print(f"Upgrades: {upgrades}")
 
 
+def _describe_action(action: str) -> str:
+    kind, _, target = action.partition(":")
+    if kind == "buy":
+        return f"Buy {data.UPGRADES_BY_ID[target].name}"
+    if kind == "promote":
+        return f"Request promotion to {data.JOBS_BY_ID[target].title}"
+    return ACTION_LABELS[kind]
+
+
 def _print_report(report) -> None:
     for line in report.messages:
         print(f"• {line}")
@@ -74,7 +95,7 @@ def _shop(engine: GameEngine) -> None:
     print()
     _print_divider()
     print("Upgrades (buy once, permanent)")
-    available = [up for up in UPGRADES if up.id not in engine.state.owned_upgrades]
+    available = [up for up in data.UPGRADES if up.id not in engine.state.owned_upgrades]
     if not available:
         print("All upgrades owned.")
         return
@@ -100,8 +121,8 @@ def _promotion(engine: GameEngine) -> None:
     print()
     _print_divider()
     print("Career Ladder")
-    current_idx = JOBS.index(engine.current_job)
-    for idx, job in enumerate(JOBS, start=1):
+    current_idx = engine.current_job_index
+    for idx, job in enumerate(data.JOBS, start=1):
         status = []
         if idx - 1 == current_idx:
             status.append("current")
@@ -127,7 +148,7 @@ def _promotion(engine: GameEngine) -> None:
         return
     try:
         choice_idx = int(selection) - 1
-        job = JOBS[choice_idx]
+        job = data.JOBS[choice_idx]
     except (ValueError, IndexError):
         print("Invalid selection.")
         return
@@ -143,8 +164,83 @@ def _show_log(engine: GameEngine) -> None:
         print(f"- {entry}")
 
 
-def main() -> None:
-    engine = GameEngine(load_state())
+def _print_stats(engine: GameEngine) -> None:
+    stats = engine.stats()
+    if not stats:
+        return
+    print("Profile (calls, total ms, us/call):")
+    for name, totals in sorted(stats.items(), key=lambda item: -item[1]["seconds"]):
+        calls, seconds = totals["calls"], totals["seconds"]
+        print(f"  {name:<28} {calls:>8} {seconds * 1000:>10.2f} {seconds * 1e6 / calls:>10.1f}")
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pour Decisions - BitLife-style Bartender Sim")
+    parser.add_argument("--profile", action="store_true", help="count calls and time hot paths; print on exit")
+    parser.add_argument("--profile-days", type=int, default=0, help="cProfile the next N in-game days")
+    parser.add_argument("--profile-out", default="pour-decisions.prof", help="where --profile-days dumps stats")
+    parser.add_argument(
+        "--pack", action="append", default=[], metavar="PATH", help="load a JSON/TOML content pack (repeatable)"
+    )
+    parser.add_argument(
+        "--save-interval",
+        type=float,
+        default=1.0,
+        metavar="SECONDS",
+        help="save in the background at most this long after a change (0 saves after every action)",
+    )
+    parser.add_argument(
+        "--hint",
+        nargs="?",
+        type=float,
+        const=HINT_BUDGET_MS,
+        default=0.0,
+        metavar="MS",
+        help=f"show an advisor hint each turn, searching for MS milliseconds (default {HINT_BUDGET_MS:g})",
+    )
+    parser.add_argument(
+        "--journal",
+        action="store_true",
+        help="append a small record per action and snapshot the full save every few days instead",
+    )
+    return parser.parse_args(argv)
+
+
+def _install_packs(paths: List[str]) -> None:
+    from .content import PackError, load_pack
+
+    for path in paths:
+        try:
+            data.install_pack(load_pack(path))
+        except (OSError, PackError) as exc:
+            sys.exit(f"Could not load content pack {path}: {exc}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
+    if args.profile:
+        profiling.enable()
+    if args.pack:
+        _install_packs(args.pack)
+    journal: Optional[Journal] = None
+    saver: Optional[WriteBehindSaver] = None
+    if args.journal:
+        journal = Journal.open()
+        engine = journal.engine
+    else:
+        engine = GameEngine(load_state())
+        saver = WriteBehindSaver(args.save_interval)
+
+    def save() -> None:
+        # A journal already holds every action; closing it compacts into a snapshot.
+        if journal is not None:
+            journal.close()
+        else:
+            saver.save(engine.state)
+            saver.close()
+
+    if args.profile_days > 0:
+        engine.profile_days(args.profile_days, args.profile_out)
     print("Pour Decisions - BitLife-style Bartender Sim (Python Edition)")
     print("Type Ctrl+C to save and quit at any time.")
 
@@ -153,6 +249,8 @@ def main() -> None:
             print()
             _print_divider()
             _print_status(engine)
+            if args.hint > 0:
+                print(f"Hint: {_describe_action(engine.suggest_action(args.hint))}")
             print()
             print("Actions:")
             print("1) Work a shift")
@@ -183,8 +281,9 @@ def main() -> None:
             elif action == "7":
                 _show_log(engine)
             elif action == "8":
-                save_state(engine.state)
+                save()
                 print("Saved. See you next shift.")
+                _print_stats(engine)
                 sys.exit(0)
             else:
                 print("Invalid choice.")
@@ -193,12 +292,20 @@ def main() -> None:
                 _print_report(report)
                 _prompt_story(engine)
 
-            save_state(engine.state)
+            if saver is not None:
+                saver.save(engine.state)
 
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, EOFError):
         print("\nCaught exit. Saving progress...")
-        save_state(engine.state)
+        save()
+        _print_stats(engine)
         sys.exit(0)
+    finally:
+        # Any other way out still writes whatever the saver has queued.
+        if saver is not None:
+            saver.close()
+        else:
+            journal.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,311 @@
+"""Declarative content packs: jobs, upgrades and events from JSON or TOML.
+
+A pack is one document with any of four lists::
+
+    {
+      "name": "late-night",
+      "jobs": [{"id": "night-porter", "title": "Night Porter", "pay_range": [40, 70],
+                "xp_required": 200, "rent": 400, "entry_fee": 0, "requires": null, "flavor": ""}],
+      "upgrades": [{"id": "earplugs", "name": "Earplugs", "cost": 30,
+                    "description": "Sleep through it.", "effects": {"sleep_bonus": 4}}],
+      "shift_events": [{"id": "happy-hour", "title": "Happy Hour", "text": "Half-price wells.",
+                        "weight": 2, "note": "Volume makes up for it.",
+                        "effects": {"tips": 20, "wage": {"mul": 0.9},
+                                    "stress_gain": {"add": -3, "min": 0}}}],
+      "story_events": [{"id": "regular", "title": "A Regular", "text": "...", "weight": 1,
+                        "choices": [{"id": "chat", "label": "Chat.", "note": "...",
+                                     "effects": {"stress": -4, "reputation": 2}}]}]
+    }
+
+Shift-event effects name ``ShiftOutcome`` fields; a bare number is a delta
+and an object may combine ``mul``, ``add`` and ``min``. They compile to
+``EffectOp`` tuples and then to the same effect vectors as the built-in
+events. ``load_pack`` validates once and caches the compiled pack
+(plain tuples, written with ``marshal``) keyed on the file's SHA-256, so
+reloading an unchanged pack skips decoding and validation.
+"""
+
+import gc
+import hashlib
+import json
+import marshal
+import os
+import tempfile
+import tomllib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from .models import (
+    OUTCOME_FIELDS,
+    STORY_FIELDS,
+    EffectOp,
+    Job,
+    ShiftEffect,
+    ShiftEvent,
+    StoryChoice,
+    StoryEvent,
+    Upgrade,
+    compile_shift_effect,
+)
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".pack-cache"
+# Bump when the compiled form changes so stale cache entries are ignored.
+CACHE_VERSION = 2
+
+UPGRADE_FIELDS = ("energy_cost", "stress_gain", "tip_bonus", "xp_bonus", "reputation_bonus", "rent_slow", "sleep_bonus")
+
+
+class PackError(ValueError):
+    """A content pack that does not match the format."""
+
+
+@dataclass(slots=True)
+class ContentPack:
+    name: str
+    jobs: List[Job] = field(default_factory=list)
+    upgrades: List[Upgrade] = field(default_factory=list)
+    shift_events: List[ShiftEvent] = field(default_factory=list)
+    story_events: List[StoryEvent] = field(default_factory=list)
+
+
+def _fields(
+    raw: object, where: str, required: Mapping[str, type], optional: Optional[Mapping[str, type]] = None
+) -> Dict[str, object]:
+    """Check ``raw`` is an object with exactly these keys and value types; ``float`` accepts ints."""
+    optional = optional or {}
+    if not isinstance(raw, dict):
+        raise PackError(f"{where}: expected an object")
+    unknown = set(raw) - set(required) - set(optional)
+    if unknown:
+        raise PackError(f"{where}: unknown keys {sorted(unknown)}")
+    for key, kind in {**required, **optional}.items():
+        if key not in raw:
+            if key in required:
+                raise PackError(f"{where}: missing {key!r}")
+            continue
+        value = raw[key]
+        if value is None and key in optional:
+            continue
+        expected = (int, float) if kind is float else kind
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise PackError(f"{where}.{key}: expected {kind.__name__}")
+    return raw
+
+
+def _int_effects(raw: object, where: str, allowed: Tuple[str, ...]) -> Dict[str, int]:
+    effects = _fields(raw, where, {}, dict.fromkeys(allowed, int))
+    return {key: int(value) for key, value in effects.items()}
+
+
+def _shift_ops(raw: object, where: str) -> Tuple[Tuple[str, float, int, Optional[int]], ...]:
+    if not isinstance(raw, dict):
+        raise PackError(f"{where}: expected an object")
+    ops = []
+    for name, spec in raw.items():
+        if name not in OUTCOME_FIELDS:
+            raise PackError(f"{where}: unknown field {name!r}")
+        if not isinstance(spec, dict):
+            spec = {"add": spec}
+        spec = _fields(spec, f"{where}.{name}", {}, {"mul": float, "add": int, "min": int})
+        factor = spec.get("mul")
+        factor = 1 if factor is None else factor
+        if factor < 0:
+            raise PackError(f"{where}.{name}.mul: expected a non-negative number")
+        ops.append((name, factor, spec.get("add") or 0, spec.get("min")))
+    return tuple(ops)
+
+
+def _weight(raw: Dict[str, object], where: str) -> int:
+    weight = raw.get("weight")
+    if weight is None:
+        return 1
+    if weight < 0:
+        raise PackError(f"{where}.weight: must not be negative")
+    return weight
+
+
+def _unique(rows: List[Tuple], where: str) -> None:
+    seen = set()
+    for row in rows:
+        if row[0] in seen:
+            raise PackError(f"{where}: duplicate id {row[0]!r}")
+        seen.add(row[0])
+
+
+# Each section validates raw entries into plain tuples of builtins (the
+# compiled form, which is what the cache stores) and builds model objects
+# back from those tuples.
+
+
+def _job_row(raw: object, where: str) -> Tuple:
+    _fields(
+        raw,
+        where,
+        {"id": str, "title": str, "pay_range": list, "xp_required": int, "rent": int},
+        {"entry_fee": int, "requires": str, "flavor": str},
+    )
+    pay = raw["pay_range"]
+    if len(pay) != 2 or not all(type(value) is int for value in pay) or pay[0] > pay[1]:
+        raise PackError(f"{where}.pay_range: expected [low, high] integers with low <= high")
+    return (
+        raw["id"],
+        raw["title"],
+        pay[0],
+        pay[1],
+        raw["xp_required"],
+        raw["rent"],
+        raw.get("entry_fee") or 0,
+        raw.get("requires"),
+        raw.get("flavor") or "",
+    )
+
+
+def _job(row: Tuple) -> Job:
+    job_id, title, low, high, xp_required, rent, entry_fee, requires, flavor = row
+    return Job(job_id, title, (low, high), xp_required, rent, entry_fee, requires, flavor)
+
+
+def _upgrade_row(raw: object, where: str) -> Tuple:
+    _fields(raw, where, {"id": str, "name": str, "cost": int, "description": str, "effects": dict})
+    effects = _int_effects(raw["effects"], f"{where}.effects", UPGRADE_FIELDS)
+    return (raw["id"], raw["name"], raw["cost"], raw["description"], effects)
+
+
+def _upgrade(row: Tuple) -> Upgrade:
+    return Upgrade(*row)
+
+
+def _shift_event_row(raw: object, where: str) -> Tuple:
+    _fields(raw, where, {"id": str, "title": str, "text": str, "effects": dict}, {"weight": int, "note": str})
+    ops = _shift_ops(raw["effects"], f"{where}.effects")
+    note = raw.get("note") or ""
+    effect = tuple(compile_shift_effect(ops, note))
+    return (raw["id"], raw["title"], raw["text"], _weight(raw, where), note, ops, effect)
+
+
+def _shift_event(row: Tuple) -> ShiftEvent:
+    event_id, title, text, weight, note, ops, effect = row
+    ops = tuple([tuple.__new__(EffectOp, op) for op in ops])
+    return ShiftEvent(event_id, title, text, None, weight, ops, note, tuple.__new__(ShiftEffect, effect))
+
+
+def _story_event_row(raw: object, where: str) -> Tuple:
+    _fields(raw, where, {"id": str, "title": str, "text": str, "choices": list}, {"weight": int})
+    if not raw["choices"]:
+        raise PackError(f"{where}.choices: needs at least one choice")
+    choices = []
+    for index, choice in enumerate(raw["choices"]):
+        at = f"{where}.choices[{index}]"
+        _fields(choice, at, {"id": str, "label": str, "effects": dict}, {"note": str})
+        effects = _int_effects(choice["effects"], f"{at}.effects", STORY_FIELDS)
+        choices.append((choice["id"], choice["label"], effects, choice.get("note") or ""))
+    _unique(choices, f"{where}.choices")
+    return (raw["id"], raw["title"], raw["text"], _weight(raw, where), tuple(choices))
+
+
+def _story_event(row: Tuple) -> StoryEvent:
+    event_id, title, text, weight, choices = row
+    return StoryEvent(event_id, title, text, [StoryChoice(*choice) for choice in choices], weight)
+
+
+_SECTIONS: Dict[str, Tuple[Callable[[object, str], Tuple], Callable[[Tuple], object]]] = {
+    "jobs": (_job_row, _job),
+    "upgrades": (_upgrade_row, _upgrade),
+    "shift_events": (_shift_event_row, _shift_event),
+    "story_events": (_story_event_row, _story_event),
+}
+
+
+def compile_pack(raw: object, source: str = "pack") -> Tuple:
+    """Validate a decoded pack document into its compiled form; raises ``PackError``.
+
+    The result is ``(name, jobs, upgrades, shift_events, story_events)`` made
+    only of builtins, so it round-trips through ``marshal``.
+    """
+    _fields(raw, source, {}, {"name": str, **dict.fromkeys(_SECTIONS, list)})
+    compiled = [raw.get("name") or source]
+    for section, (compile_entry, _) in _SECTIONS.items():
+        rows = [compile_entry(entry, f"{source}.{section}[{index}]") for index, entry in enumerate(raw.get(section) or ())]
+        _unique(rows, f"{source}.{section}")
+        compiled.append(tuple(rows))
+    return tuple(compiled)
+
+
+def build_pack(compiled: Tuple) -> ContentPack:
+    """Model objects for a compiled pack."""
+    name, *sections = compiled
+    pack = ContentPack(name)
+    for (section, (_, build)), rows in zip(_SECTIONS.items(), sections):
+        setattr(pack, section, [build(row) for row in rows])
+    return pack
+
+
+def parse_pack(raw: object, source: str = "pack") -> ContentPack:
+    """Validate and build a decoded pack document; raises ``PackError``."""
+    with _gc_paused():
+        return build_pack(compile_pack(raw, source))
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Decoding and building a large pack allocates tens of thousands of
+    # containers, which would otherwise trigger full collections that free
+    # nothing.
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _decode(payload: bytes, path: Path) -> object:
+    try:
+        if path.suffix == ".toml":
+            return tomllib.loads(payload.decode("utf-8"))
+        return json.loads(payload)
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise PackError(f"{path}: {exc}") from exc
+
+
+def _write_cache(target: Path, payload: bytes) -> None:
+    # Best effort: a read-only or full cache directory only costs a re-parse.
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(payload)
+        os.replace(temp_name, target)
+    except OSError:
+        try:
+            os.unlink(temp_name)
+        except FileNotFoundError:
+            pass
+
+
+def load_pack(path: os.PathLike, cache_dir: Optional[os.PathLike] = CACHE_DIR) -> ContentPack:
+    """Load a ``.json`` or ``.toml`` pack, from the compiled cache when the file is unchanged.
+
+    ``cache_dir=None`` always parses and never writes a cache entry.
+    """
+    path = Path(path)
+    payload = path.read_bytes()
+    cached = None
+    with _gc_paused():
+        if cache_dir is not None:
+            digest = hashlib.sha256(payload).hexdigest()
+            cached = Path(cache_dir) / f"{digest}.v{CACHE_VERSION}-{marshal.version}.bin"
+            try:
+                return build_pack(marshal.loads(cached.read_bytes()))
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+        compiled = compile_pack(_decode(payload, path), path.stem)
+        if cached is not None:
+            _write_cache(cached, marshal.dumps(compiled))
+        return build_pack(compiled)
@@ -1,12 +1,13 @@
 import random
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
-from . import data
-from .data import JOBS, SHIFT_EVENTS, STORY_EVENTS, UPGRADES, initial_state
+from . import data, profiling
 from .models import (
     ActionReport,
+    EventTable,
     GameState,
     Job,
+    LogEntry,
     ShiftEvent,
     ShiftOutcome,
     StoryChoice,
@@ -14,129 +15,149 @@ from .models import (
     Upgrade,
 )
 
+if TYPE_CHECKING:
+    from .export import DayRecorder
+
 
 def clamp(value: int, min_value: int, max_value: int) -> int:
     return max(min_value, min(max_value, value))
 
 
-def rand_range(min_value: int, max_value: int) -> int:
-    return random.randint(min_value, max_value)
+def rand_range(min_value: int, max_value: int, rng: Optional[random.Random] = None) -> int:
+    return (rng or random).randint(min_value, max_value)
 
 
 class GameEngine:
-    def __init__(self, state: Optional[GameState] = None) -> None:
-        self.state = state or initial_state()
+    def __init__(
+        self,
+        state: Optional[GameState] = None,
+        headless: bool = False,
+        rng: Optional[random.Random] = None,
+        profile: Optional[bool] = None,
+    ) -> None:
+        self.state = state or data.initial_state()
+        self.headless = headless
+        self.rng = rng or random.Random()
+        # Upgrade effect totals for ``_effects_state``; purchase_upgrade resets them.
+        self._effects: Dict[str, int] = {}
+        self._effects_state: Optional[GameState] = None
+        # Scratch outcome handed to shift events, reset at the start of every shift.
+        self._outcome = ShiftOutcome(0, 0, 0, 0, 0)
+        # Call counters, only when profiling (default: the POUR_DECISIONS_PROFILE switch).
+        self._stats: Optional[profiling.CallStats] = None
+        if profiling.enabled if profile is None else profile:
+            self._stats = profiling.CallStats()
+            profiling.instrument(self, self._stats)
 
     @property
     def current_job(self) -> Job:
-        job = next((job for job in JOBS if job.id == self.state.job_id), JOBS[0])
-        return job
+        return data.JOBS_BY_ID.get(self.state.job_id, data.JOBS[0])
+
+    @property
+    def current_job_index(self) -> int:
+        return data.JOB_INDEX.get(self.state.job_id, 0)
 
     def has_upgrade(self, upgrade_id: str) -> bool:
         return upgrade_id in self.state.owned_upgrades
 
+    def _upgrade_effects(self) -> Dict[str, int]:
+        if self._effects_state is not self.state:
+            self._effects = data.UPGRADE_REGISTRY.effects(data.UPGRADE_REGISTRY.mask(self.state.owned_upgrades))
+            self._effects_state = self.state
+        return self._effects
+
     def _upgrade_effect(self, key: str) -> int:
-        total = 0
-        for upgrade in UPGRADES:
-            if upgrade.id in self.state.owned_upgrades:
-                total += upgrade.effects.get(key, 0)
-        return total
-
-    def _push_log(self, message: str) -> None:
-        self.state.log.insert(0, message)
-        self.state.log = self.state.log[:20]
-
-    def _weighted_choice(self, events: List[ShiftEvent] | List[StoryEvent]) -> ShiftEvent | StoryEvent:
-        total_weight = sum(event.weight for event in events)
-        pick = random.uniform(0, total_weight)
-        current = 0.0
-        for event in events:
-            current += event.weight
-            if pick <= current:
-                return event
-        return events[-1]
+        return self._upgrade_effects().get(key, 0)
+
+    def _push_log(self, entry: LogEntry) -> None:
+        self.state.writable_log().appendleft(entry)
+
+    def _report(self, messages: List[LogEntry], code: str, **data: object) -> None:
+        # Headless engines (sims, rollouts, bots) keep no log and get no messages.
+        if self.headless:
+            return
+        entry = LogEntry(code, data)
+        messages.append(entry)
+        self._push_log(entry)
+
+    def _weighted_choice(
+        self, events: EventTable | List[ShiftEvent] | List[StoryEvent]
+    ) -> ShiftEvent | StoryEvent:
+        if not isinstance(events, EventTable):
+            events = EventTable(events)
+        return events.pick(self.rng)
 
     def _resolve_commute(self, mode: str) -> Tuple[bool, int, int, str]:
         if mode == "car" and not self.has_upgrade("car"):
-            return False, 0, 0, "No car yet. Back on the bus."
+            return False, 0, 0, "commute-no-car"
 
         if mode == "bus":
-            late = random.random() < 0.35
-            stress_delta = 3 + (4 if random.random() < 0.25 else 0)
-            note = "Bus crawls through traffic. You arrive late." if late else "Bus ride: cheap and cramped."
+            late = self.rng.random() < 0.35
+            stress_delta = 3 + (4 if self.rng.random() < 0.25 else 0)
+            note = "commute-bus-late" if late else "commute-bus"
             return late, stress_delta, 0, note
 
-        breakdown = random.random() < 0.18
-        traffic = (not breakdown) and random.random() < 0.3
+        breakdown = self.rng.random() < 0.18
+        traffic = (not breakdown) and self.rng.random() < 0.3
         late = False
         stress_delta = 2
         cash_change = 0
-        note = "You glide through neon streets in your beater car."
+        note = "commute-car"
 
         if breakdown:
-            cash_change = -rand_range(35, 60)
+            cash_change = -rand_range(35, 60, self.rng)
             stress_delta += 14
-            late = random.random() < 0.4
-            note = "Car coughs to a stop. Repair eats cash and time."
+            late = self.rng.random() < 0.4
+            note = "commute-car-breakdown"
         elif traffic:
             stress_delta += 8
-            late = random.random() < 0.22
-            note = "Gridlock. Horns blare. Pulse rises."
+            late = self.rng.random() < 0.22
+            note = "commute-car-traffic"
 
         return late, stress_delta, cash_change, note
 
-    def _advance_day(self, rent_increment: int, messages: List[str]) -> None:
+    def _advance_day(self, rent_increment: int, messages: List[LogEntry]) -> None:
         rent_increment = max(0, rent_increment)
         self.state.day += 1
         self.state.rent_progress += rent_increment
         self._apply_rent_pressure(messages)
         if self.state.day % 365 == 0:
             self.state.age += 1
-            birthday = f"You turned {self.state.age}. Service life does not slow down."
-            messages.append(birthday)
-            self._push_log(birthday)
+            self._report(messages, "birthday", age=self.state.age)
 
-    def _apply_rent_pressure(self, messages: List[str]) -> None:
+    def _apply_rent_pressure(self, messages: List[LogEntry]) -> None:
         rent_due = self.current_job.rent
         while self.state.rent_progress >= 100:
             if self.state.cash >= rent_due:
                 self.state.cash -= rent_due
                 self.state.rent_progress -= 100
-                note = f"Paid rent: ${rent_due}."
-                messages.append(note)
-                self._push_log(note)
+                self._report(messages, "rent-paid", rent=rent_due)
             else:
-                demotion = JOBS[0]
+                demotion = data.JOBS[0]
                 self.state.cash = 0
                 self.state.rent_progress = 0
                 self.state.job_id = demotion.id
-                note = f"Evicted. Cash wiped and demoted to {demotion.title}."
-                messages.append(note)
-                self._push_log(note)
+                self._report(messages, "evicted", job=demotion.title)
                 break
 
     def start_shift(self, commute_mode: str = "bus") -> ActionReport:
-        messages: List[str] = []
+        messages: List[LogEntry] = []
 
         if self.state.energy < 15:
-            msg = "Too exhausted to work. Crash at home first."
-            messages.append(msg)
-            self._push_log(msg)
+            self._report(messages, "too-exhausted")
             return ActionReport(messages=messages, day_advanced=False)
 
         if self.state.stress > 95:
-            msg = "You freeze at the door. Stress is maxed."
-            messages.append(msg)
-            self._push_log(msg)
+            self._report(messages, "stress-maxed")
             return ActionReport(messages=messages, day_advanced=False)
 
         job = self.current_job
-        job_index = JOBS.index(job)
+        job_index = self.current_job_index
 
         energy_cost = 22 + job_index * 2
         stress_gain = 14 + job_index * 2
-        wage = rand_range(job.pay_range[0], job.pay_range[1])
-        tips = rand_range(14, 38) + self._upgrade_effect("tip_bonus")
+        wage = rand_range(job.pay_range[0], job.pay_range[1], self.rng)
+        tips = rand_range(14, 38, self.rng) + self._upgrade_effect("tip_bonus")
         xp_gain = 22 + job_index * 6 + self._upgrade_effect("xp_bonus")
         reputation_gain = self._upgrade_effect("reputation_bonus")
         cash_change = 0
@@ -147,41 +168,58 @@ class GameEngine:
         late, commute_stress, commute_cash, commute_note = self._resolve_commute(commute_mode)
         stress_gain += commute_stress
         cash_change += commute_cash
-        messages.append(commute_note)
-        self._push_log(commute_note)
+        self._report(messages, commute_note)
 
         if late:
             tips = max(0, int(tips * 0.25))
             wage = max(0, int(wage * 0.85))
             xp_gain = max(6, xp_gain - 4)
-            messages.append("Late to the shift. Tips are crushed.")
-            self._push_log("Late to the shift. Tips are crushed.")
+            self._report(messages, "late")
 
         notes: List[str] = []
 
-        if random.random() < 0.55:
-            event = self._weighted_choice(SHIFT_EVENTS)
-            outcome = ShiftOutcome(
-                wage=wage,
-                tips=tips,
-                energy_cost=energy_cost,
-                stress_gain=stress_gain,
-                xp_gain=xp_gain,
-                reputation_gain=reputation_gain,
-                cash_change=cash_change,
-            )
-            event.apply(outcome)
-            wage = max(0, outcome.wage)
-            tips = max(0, outcome.tips)
-            energy_cost = max(8, outcome.energy_cost)
-            stress_gain = max(0, outcome.stress_gain)
-            xp_gain = max(8, outcome.xp_gain)
-            reputation_gain += outcome.reputation_gain
-            cash_change = outcome.cash_change
-            notes = outcome.notes
-            event_line = f"{event.title}: {event.text}"
-            messages.append(event_line)
-            self._push_log(event_line)
+        if self.rng.random() < 0.55:
+            event = self._weighted_choice(data.SHIFT_EVENT_TABLE)
+            effect = event.effect
+            if effect is None:
+                outcome = self._outcome.reset(
+                    wage=wage,
+                    tips=tips,
+                    energy_cost=energy_cost,
+                    stress_gain=stress_gain,
+                    xp_gain=xp_gain,
+                    reputation_gain=reputation_gain,
+                    cash_change=cash_change,
+                )
+                event.apply(outcome)
+                applied = (
+                    outcome.wage,
+                    outcome.tips,
+                    outcome.energy_cost,
+                    outcome.stress_gain,
+                    outcome.xp_gain,
+                    outcome.reputation_gain,
+                    outcome.cash_change,
+                )
+                notes = outcome.notes
+            else:
+                applied = [wage, tips, energy_cost, stress_gain, xp_gain, reputation_gain, cash_change]
+                for slot, delta, floor in effect.adds:
+                    value = applied[slot] + delta
+                    applied[slot] = value if value > floor else floor
+                for slot, factor, delta, floor in effect.scales:
+                    value = int(applied[slot] * factor) + delta
+                    applied[slot] = value if value > floor else floor
+                if effect.note:
+                    notes = [effect.note]
+            wage, tips, energy_cost, stress_gain, xp_gain, event_reputation, cash_change = applied
+            wage = max(0, wage)
+            tips = max(0, tips)
+            energy_cost = max(8, energy_cost)
+            stress_gain = max(0, stress_gain)
+            xp_gain = max(8, xp_gain)
+            reputation_gain += event_reputation
+            self._report(messages, "shift-event", event=event.id, title=event.title, text=event.text)
 
         earnings = wage + tips + cash_change
         self.state.cash += earnings
@@ -191,13 +229,9 @@ class GameEngine:
         if reputation_gain:
             self.state.reputation = clamp(self.state.reputation + reputation_gain, 0, 150)
 
-        summary = f"Shift finished as {job.title}: +${earnings} (${wage} wage, ${tips} tips)"
-        messages.append(summary)
-        self._push_log(summary)
-
+        self._report(messages, "shift-summary", job=job.title, earnings=earnings, wage=wage, tips=tips)
         for note in notes:
-            messages.append(note)
-            self._push_log(note)
+            self._report(messages, "event-note", text=note)
 
         rent_increment = max(6, 14 + self._upgrade_effect("rent_slow"))
         self._advance_day(rent_increment, messages)
@@ -205,16 +239,14 @@ class GameEngine:
         return ActionReport(messages=messages, day_advanced=True)
 
     def rest(self) -> ActionReport:
-        messages: List[str] = []
+        messages: List[LogEntry] = []
         energy_gain = 42 + self._upgrade_effect("sleep_bonus")
         stress_relief = 20 + max(0, self._upgrade_effect("sleep_bonus") // 3)
 
         self.state.energy = clamp(self.state.energy + energy_gain, 0, 120)
         self.state.stress = clamp(self.state.stress - stress_relief, 0, 140)
 
-        summary = f"You crash at home and sleep. +{energy_gain} energy, -{stress_relief} stress."
-        messages.append(summary)
-        self._push_log(summary)
+        self._report(messages, "rest", energy=energy_gain, stress=stress_relief)
 
         rent_increment = max(4, 6 + self._upgrade_effect("rent_slow"))
         self._advance_day(rent_increment, messages)
@@ -222,7 +254,7 @@ class GameEngine:
         return ActionReport(messages=messages, day_advanced=True)
 
     def practice(self) -> ActionReport:
-        messages: List[str] = []
+        messages: List[LogEntry] = []
         energy_cost = max(10, 20 + self._upgrade_effect("energy_cost"))
         stress_gain = max(0, 6 + self._upgrade_effect("stress_gain"))
         xp_gain = 48 + self._upgrade_effect("xp_bonus")
@@ -230,9 +262,7 @@ class GameEngine:
         cash_cost = 12
 
         if self.state.energy < energy_cost:
-            msg = "Not enough energy to practice. Rest first."
-            messages.append(msg)
-            self._push_log(msg)
+            self._report(messages, "practice-tired")
             return ActionReport(messages=messages, day_advanced=False)
 
         self.state.energy = clamp(self.state.energy - energy_cost, 0, 120)
@@ -241,9 +271,7 @@ class GameEngine:
         self.state.xp += xp_gain
         self.state.reputation = clamp(self.state.reputation + reputation_gain, 0, 150)
 
-        summary = f"Practiced pours and recipes. -{energy_cost} energy, +{xp_gain} XP, +{reputation_gain} reputation."
-        messages.append(summary)
-        self._push_log(summary)
+        self._report(messages, "practice", energy=energy_cost, xp=xp_gain, reputation=reputation_gain)
 
         rent_increment = max(6, 10 + self._upgrade_effect("rent_slow"))
         self._advance_day(rent_increment, messages)
@@ -251,109 +279,119 @@ class GameEngine:
         return ActionReport(messages=messages, day_advanced=True)
 
     def pay_rent_now(self) -> ActionReport:
-        messages: List[str] = []
+        messages: List[LogEntry] = []
         rent_due = self.current_job.rent
         if self.state.cash >= rent_due:
             self.state.cash -= rent_due
             self.state.rent_progress = 0
-            note = f"Paid rent early: ${rent_due}. Pressure resets."
-            messages.append(note)
-            self._push_log(note)
+            self._report(messages, "rent-paid-early", rent=rent_due)
         else:
-            note = f"Need ${rent_due} to cover rent. Cash on hand: ${self.state.cash}."
-            messages.append(note)
-            self._push_log(note)
+            self._report(messages, "rent-short", rent=rent_due, cash=self.state.cash)
         return ActionReport(messages=messages, day_advanced=False)
 
     def available_promotions(self) -> List[Job]:
-        current_index = JOBS.index(self.current_job)
-        return JOBS[current_index + 1 :]
+        return data.JOBS[self.current_job_index + 1 :]
 
     def request_promotion(self, job_id: str) -> ActionReport:
-        messages: List[str] = []
-        target = next((job for job in JOBS if job.id == job_id), None)
+        messages: List[LogEntry] = []
+        target = data.JOBS_BY_ID.get(job_id)
         if not target:
-            messages.append("That role does not exist.")
+            messages.append(LogEntry("no-such-job", {}))
             return ActionReport(messages=messages, day_advanced=False)
 
-        current_index = JOBS.index(self.current_job)
-        target_index = JOBS.index(target)
-        if target_index <= current_index:
-            msg = "You already wear that name tag."
-            messages.append(msg)
-            self._push_log(msg)
+        if data.JOB_INDEX[target.id] <= self.current_job_index:
+            self._report(messages, "already-job")
             return ActionReport(messages=messages, day_advanced=False)
 
         if target.requires and not self.has_upgrade(target.requires):
-            msg = "Need the required training first."
-            messages.append(msg)
-            self._push_log(msg)
+            self._report(messages, "needs-training")
             return ActionReport(messages=messages, day_advanced=False)
 
         if self.state.xp < target.xp_required:
-            msg = "Not enough XP to impress management yet."
-            messages.append(msg)
-            self._push_log(msg)
+            self._report(messages, "needs-xp")
             return ActionReport(messages=messages, day_advanced=False)
 
         if target.entry_fee and self.state.cash < target.entry_fee:
-            msg = f"Need ${target.entry_fee} to onboard."
-            messages.append(msg)
-            self._push_log(msg)
+            self._report(messages, "needs-entry-fee", fee=target.entry_fee)
             return ActionReport(messages=messages, day_advanced=False)
 
         self.state.cash -= target.entry_fee
         self.state.job_id = target.id
-        note = f"Promoted to {target.title}!"
-        messages.append(note)
-        self._push_log(note)
+        self._report(messages, "promoted", job=target.title)
 
         return ActionReport(messages=messages, day_advanced=False)
 
     def purchase_upgrade(self, upgrade_id: str) -> ActionReport:
-        messages: List[str] = []
-        upgrade = next((up for up in UPGRADES if up.id == upgrade_id), None)
+        messages: List[LogEntry] = []
+        upgrade = data.UPGRADES_BY_ID.get(upgrade_id)
         if not upgrade:
-            messages.append("That upgrade does not exist.")
+            messages.append(LogEntry("no-such-upgrade", {}))
             return ActionReport(messages=messages, day_advanced=False)
 
         if self.has_upgrade(upgrade.id):
-            msg = f"{upgrade.name} already owned."
-            messages.append(msg)
-            self._push_log(msg)
+            self._report(messages, "upgrade-owned", upgrade=upgrade.name)
             return ActionReport(messages=messages, day_advanced=False)
 
         if self.state.cash < upgrade.cost:
-            msg = f"Need ${upgrade.cost} for {upgrade.name}."
-            messages.append(msg)
-            self._push_log(msg)
+            self._report(messages, "upgrade-short", cost=upgrade.cost, upgrade=upgrade.name)
             return ActionReport(messages=messages, day_advanced=False)
 
         self.state.cash -= upgrade.cost
-        self.state.owned_upgrades.append(upgrade.id)
-        note = f"Bought {upgrade.name}. {upgrade.description}"
-        messages.append(note)
-        self._push_log(note)
+        self.state.owned_upgrades.add(upgrade.id)
+        self._effects_state = None
+        self._report(messages, "upgrade-bought", upgrade=upgrade.name, description=upgrade.description)
 
         return ActionReport(messages=messages, day_advanced=False)
 
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Calls and wall seconds per instrumented method, plus process-wide storage totals."""
+        totals = self._stats.as_dict() if self._stats else {}
+        totals.update(profiling.STORAGE_STATS.as_dict())
+        return totals
+
+    def profile_days(self, days: int, path: Optional[str] = None) -> profiling.DayProfile:
+        """Start a cProfile capture that stops after ``days`` simulated days (dumped to ``path``)."""
+        return profiling.DayProfile(self, days, path)
+
+    def record_days(self, emit: Callable[[object], object], career: int = 0) -> "DayRecorder":
+        """Pass an ``export.DayRecord`` to ``emit`` (e.g. a sink's ``write``) as each day ends."""
+        from .export import DayRecorder
+
+        return DayRecorder(self, emit, career)
+
+    def snapshot(self) -> GameState:
+        """Branch point for ``restore``: a clone of the current state."""
+        return self.state.clone()
+
+    def restore(self, snapshot: GameState) -> None:
+        """Rewind to ``snapshot`` in place; the snapshot can be restored again."""
+        self.state.copy_from(snapshot)
+        self._effects_state = None
+
+    def suggest_action(self, budget_ms: float = 50.0) -> str:
+        """Advisor pick for the current state, in ``sim.perform`` action names."""
+        from .advisor import default_advisor
+
+        return default_advisor().suggest(self.state, budget_ms)
+
     def pick_story_event(self) -> Optional[StoryEvent]:
-        if random.random() < 0.3:
-            return self._weighted_choice(STORY_EVENTS)
+        if self.rng.random() < 0.3:
+            return self._weighted_choice(data.STORY_EVENT_TABLE)
         return None
 
     def apply_story_choice(self, event: StoryEvent, choice: StoryChoice) -> ActionReport:
-        messages: List[str] = []
-        effects = choice.effects
-
-        self.state.energy = clamp(self.state.energy + effects.get("energy", 0), 0, 120)
-        self.state.stress = clamp(self.state.stress + effects.get("stress", 0), 0, 140)
-        self.state.cash += effects.get("cash", 0)
-        self.state.xp = max(0, self.state.xp + effects.get("xp", 0))
-        self.state.reputation = clamp(self.state.reputation + effects.get("reputation", 0), 0, 150)
-
-        summary = f"{event.title} -> {choice.label}: {choice.note}"
-        messages.append(summary)
-        self._push_log(summary)
+        messages: List[LogEntry] = []
+        state = self.state
+        energy, stress, cash, xp, reputation = choice.deltas
+
+        state.energy = clamp(state.energy + energy, 0, 120)
+        state.stress = clamp(state.stress + stress, 0, 140)
+        state.cash += cash
+        state.xp = max(0, state.xp + xp)
+        state.reputation = clamp(state.reputation + reputation, 0, 150)
+
+        self._report(
+            messages, "story", event=event.id, choice=choice.id, title=event.title, label=choice.label, note=choice.note
+        )
 
         return ActionReport(messages=messages, day_advanced=False)
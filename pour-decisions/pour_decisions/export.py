@@ -0,0 +1,373 @@
+"""Streaming per-day trajectory export: CSV, JSON Lines or a chunked columnar format.
+
+A ``DayRecorder`` shadows an engine's ``_advance_day`` and day-advancing
+actions per instance (as profiling does), so it emits one ``DayRecord`` as
+each day ends and engines that are not recording pay nothing. Records go to
+any callable; the sinks below buffer at most ``chunk_size`` rows before
+writing, so memory stays flat however long the run. ``trajectory`` and
+``careers`` are generators over headless policy runs::
+
+    with open_sink("runs.ptraj") as sink:
+        sink.write_all(careers(grind_policy, 100_000, 3650))
+
+Columnar layout (little-endian): ``PDTR``, u16 version, u16 column count,
+then per column a u8-prefixed name and a one-byte ``array`` typecode
+(``s`` for strings). Then chunks until EOF: u32 rows, u32 new strings and
+those strings (u16-prefixed UTF-8, appended to a file-wide table), then
+each column as a packed array; string columns hold u32 indexes into the
+table.
+"""
+
+import abc
+import argparse
+import csv
+import json
+import random
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from .data import initial_state
+from .models import GameState
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
+    from .sim import Policy
+
+
+class DayRecord(NamedTuple):
+    career: int
+    day: int
+    cash: int
+    energy: int
+    stress: int
+    xp: int
+    reputation: int
+    rent_progress: int
+    job_id: str
+    action: str
+    event: str
+
+
+FIELDS = DayRecord._fields
+# Column typecodes for the columnar format: ``array`` codes, or "s" for strings.
+COLUMNS = ("I", "i", "q", "i", "i", "q", "i", "i", "s", "s", "s")
+
+MAGIC = b"PDTR"
+VERSION = 1
+CHUNK_SIZE = 16384
+_HEADER = struct.Struct("<4sHH")
+_CHUNK = struct.Struct("<II")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_SWAP = sys.byteorder == "big"
+
+# Actions that end a day, in ``sim.perform`` names.
+_DAY_ACTIONS = ("start_shift", "rest", "practice")
+_SHADOWED = ("_advance_day", "_weighted_choice") + _DAY_ACTIONS
+
+
+class DayRecorder:
+    """Emit a ``DayRecord`` for every day ``engine`` plays until ``stop``.
+
+    ``event`` is the shift event of that day, or "" when none fired.
+    """
+
+    def __init__(self, engine: "GameEngine", emit: Callable[[DayRecord], object], career: int = 0) -> None:
+        self.engine = engine
+        self.emit: Optional[Callable[[DayRecord], object]] = emit
+        self.career = career
+        self.action = ""
+        self.event = ""
+        # Attributes this recorder shadows, to put back on stop (profiling wrappers live there too).
+        self._shadowed = {name: engine.__dict__.get(name) for name in _SHADOWED}
+        start_shift, rest, practice = (getattr(engine, name) for name in _DAY_ACTIONS)
+        weighted_choice, advance_day = engine._weighted_choice, engine._advance_day
+
+        def shift(commute_mode: str = "bus"):
+            self.action, self.event = f"shift-{commute_mode}", ""
+            return start_shift(commute_mode)
+
+        def rest_action():
+            self.action, self.event = "rest", ""
+            return rest()
+
+        def practice_action():
+            self.action, self.event = "practice", ""
+            return practice()
+
+        def choose(events):
+            picked = weighted_choice(events)
+            self.event = picked.id
+            return picked
+
+        def advance_and_emit(rent_increment, messages):
+            advance_day(rent_increment, messages)
+            if self.emit is None:
+                return
+            state = engine.state
+            self.emit(
+                DayRecord(
+                    self.career,
+                    state.day,
+                    state.cash,
+                    state.energy,
+                    state.stress,
+                    state.xp,
+                    state.reputation,
+                    state.rent_progress,
+                    state.job_id,
+                    self.action,
+                    self.event,
+                )
+            )
+
+        self._wrappers = {
+            "_advance_day": advance_and_emit,
+            "_weighted_choice": choose,
+            "start_shift": shift,
+            "rest": rest_action,
+            "practice": practice_action,
+        }
+        for name, wrapper in self._wrappers.items():
+            setattr(engine, name, wrapper)
+
+    def stop(self) -> None:
+        """Stop emitting and unwind; a wrapper shadowed since (a ``DayProfile``) stays as a pass-through."""
+        self.emit = None
+        engine = self.engine
+        for name, previous in self._shadowed.items():
+            if engine.__dict__.get(name) is not self._wrappers[name]:
+                continue
+            if previous is None:
+                del engine.__dict__[name]
+            else:
+                setattr(engine, name, previous)
+        self._shadowed = {}
+
+
+def trajectory(
+    policy: "Policy",
+    days: int,
+    state: Optional[GameState] = None,
+    rng: Optional[random.Random] = None,
+    career: int = 0,
+) -> Iterator[DayRecord]:
+    """Play like ``sim.run_policy`` but yield each day's record as it is played."""
+    from .engine import GameEngine
+    from .sim import perform
+
+    engine = GameEngine(state, headless=True, rng=rng)
+    pending: List[DayRecord] = []
+    DayRecorder(engine, pending.append, career)
+    state = engine.state
+    last_day = state.day + days
+    while state.day < last_day:
+        day = state.day
+        perform(engine, policy(engine))
+        if state.day == day:
+            engine.rest()
+        yield from pending
+        pending.clear()
+
+
+def careers(policy: "Policy", count: int, days: int, seed: int = 0, start: int = 0) -> Iterator[DayRecord]:
+    """Records for careers ``start`` to ``start + count``, seeded as ``sim.run_careers`` seeds them."""
+    from .sim import career_seed
+
+    for career in range(start, start + count):
+        yield from trajectory(policy, days, initial_state(), random.Random(career_seed(seed, career)), career)
+
+
+class TrajectorySink(abc.ABC):
+    """Buffers rows and writes them ``chunk_size`` at a time; use as a context manager."""
+
+    suffix = ""
+
+    def __init__(self, path: Path, chunk_size: int = CHUNK_SIZE) -> None:
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self._buffer: List[DayRecord] = []
+        self._handle = self._open()
+
+    def _open(self):
+        return self.path.open("w", encoding="utf-8", newline="")
+
+    @abc.abstractmethod
+    def _write_chunk(self, rows: List[DayRecord]) -> None:
+        """Write one buffered chunk of rows to ``self._handle``."""
+
+    def write(self, record: DayRecord) -> None:
+        buffer = self._buffer
+        buffer.append(record)
+        if len(buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_all(self, records: Iterable[DayRecord]) -> int:
+        """Drain ``records`` into the sink; returns how many were written."""
+        before = self.rows + len(self._buffer)
+        buffer, chunk_size = self._buffer, self.chunk_size
+        for record in records:
+            buffer.append(record)
+            if len(buffer) >= chunk_size:
+                self.flush()
+        return self.rows + len(self._buffer) - before
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._write_chunk(self._buffer)
+            self.rows += len(self._buffer)
+            self._buffer.clear()
+        self._handle.flush()
+
+    def close(self) -> None:
+        if self._handle.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._handle.close()
+
+    def __enter__(self) -> "TrajectorySink":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class CsvSink(TrajectorySink):
+    suffix = ".csv"
+
+    def __init__(self, path: Path, chunk_size: int = CHUNK_SIZE) -> None:
+        super().__init__(path, chunk_size)
+        self._writer = csv.writer(self._handle)
+        self._writer.writerow(FIELDS)
+
+    def _write_chunk(self, rows: List[DayRecord]) -> None:
+        self._writer.writerows(rows)
+
+
+class JsonlSink(TrajectorySink):
+    suffix = ".jsonl"
+
+    def _write_chunk(self, rows: List[DayRecord]) -> None:
+        dumps = json.JSONEncoder(separators=(",", ":")).encode
+        self._handle.write("".join([dumps(dict(zip(FIELDS, row))) + "\n" for row in rows]))
+
+
+class ColumnarSink(TrajectorySink):
+    """Chunked columnar binary format; see the module docstring for the layout."""
+
+    suffix = ".ptraj"
+
+    def __init__(self, path: Path, chunk_size: int = CHUNK_SIZE) -> None:
+        super().__init__(path, chunk_size)
+        self._strings: Dict[str, int] = {}
+        header = [_HEADER.pack(MAGIC, VERSION, len(FIELDS))]
+        for name, kind in zip(FIELDS, COLUMNS):
+            header.append(_U8.pack(len(name)) + name.encode("ascii") + kind.encode("ascii"))
+        self._handle.write(b"".join(header))
+
+    def _open(self):
+        return self.path.open("wb")
+
+    def _write_chunk(self, rows: List[DayRecord]) -> None:
+        strings = self._strings
+        new: List[bytes] = []
+        columns: List[bytes] = []
+        for kind, values in zip(COLUMNS, zip(*rows)):
+            if kind == "s":
+                for value in set(values).difference(strings):
+                    strings[value] = len(strings)
+                    encoded = value.encode("utf-8")
+                    new.append(_U16.pack(len(encoded)) + encoded)
+                values = array("I", map(strings.__getitem__, values))
+            else:
+                values = array(kind, values)
+            if _SWAP:
+                values.byteswap()
+            columns.append(values.tobytes())
+        self._handle.write(b"".join([_CHUNK.pack(len(rows), len(new)), *new, *columns]))
+
+
+SINKS = {sink.suffix: sink for sink in (CsvSink, JsonlSink, ColumnarSink)}
+
+
+def open_sink(path: Path, chunk_size: int = CHUNK_SIZE) -> TrajectorySink:
+    """Sink for ``path``, picked by its suffix (``.csv``, ``.jsonl`` or ``.ptraj``)."""
+    path = Path(path)
+    sink = SINKS.get(path.suffix)
+    if sink is None:
+        raise ValueError(f"unknown trajectory format {path.suffix!r} (use {', '.join(SINKS)})")
+    return sink(path, chunk_size)
+
+
+def _read_exact(handle, size: int) -> bytes:
+    payload = handle.read(size)
+    if len(payload) != size:
+        raise ValueError("truncated trajectory file")
+    return payload
+
+
+def read_columns(path: Path) -> Iterator[Dict[str, object]]:
+    """Yield each chunk of a columnar file as ``{field: array or list of str}``."""
+    with Path(path).open("rb") as handle:
+        magic, version, count = _HEADER.unpack(_read_exact(handle, _HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a trajectory file")
+        schema = []
+        for _ in range(count):
+            (length,) = _U8.unpack(_read_exact(handle, 1))
+            name = _read_exact(handle, length).decode("ascii")
+            schema.append((name, _read_exact(handle, 1).decode("ascii")))
+        strings: List[str] = []
+        while True:
+            head = handle.read(_CHUNK.size)
+            if not head:
+                return
+            if len(head) != _CHUNK.size:
+                raise ValueError("truncated trajectory file")
+            rows, new = _CHUNK.unpack(head)
+            for _ in range(new):
+                (length,) = _U16.unpack(_read_exact(handle, 2))
+                strings.append(_read_exact(handle, length).decode("utf-8"))
+            chunk: Dict[str, object] = {}
+            for name, kind in schema:
+                values = array("I" if kind == "s" else kind)
+                values.frombytes(_read_exact(handle, rows * values.itemsize))
+                if _SWAP:
+                    values.byteswap()
+                chunk[name] = [strings[index] for index in values] if kind == "s" else values
+            yield chunk
+
+
+def read_records(path: Path) -> Iterator[DayRecord]:
+    """Yield the rows of a columnar file one ``DayRecord`` at a time."""
+    for chunk in read_columns(path):
+        yield from map(DayRecord._make, zip(*(chunk[name] for name in FIELDS)))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .sim import grind_policy
+
+    parser = argparse.ArgumentParser(description="Stream grind-policy career trajectories to a file")
+    parser.add_argument("output", type=Path, help="destination; format from the suffix (.csv, .jsonl, .ptraj)")
+    parser.add_argument("--careers", type=int, default=1)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    try:
+        sink = open_sink(args.output, args.chunk_size)
+    except ValueError as exc:
+        parser.error(str(exc))
+    with sink:
+        rows = sink.write_all(careers(grind_policy, args.careers, args.days, args.seed))
+    print(f"Wrote {rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
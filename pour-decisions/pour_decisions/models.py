@@ -1,8 +1,27 @@
+import random
+from bisect import bisect_left
+from collections import deque
+from collections.abc import MutableSet
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Optional, Tuple
+from functools import partial
+from itertools import accumulate, islice
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class Job:
     id: str
     title: str
@@ -14,7 +33,7 @@ class Job:
     flavor: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Upgrade:
     id: str
     name: str
@@ -23,7 +42,42 @@ class Upgrade:
     effects: Dict[str, int]
 
 
-@dataclass
+@dataclass(frozen=True)
+class UpgradeRegistry:
+    """Fixed upgrade list where each upgrade owns one bit of an ownership mask."""
+
+    upgrades: Tuple[Upgrade, ...]
+    bits: Dict[str, int] = field(init=False, repr=False)
+    _totals: Dict[int, Dict[str, int]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "bits", {upgrade.id: 1 << index for index, upgrade in enumerate(self.upgrades)})
+        object.__setattr__(self, "_totals", {})
+
+    def mask(self, upgrade_ids: Iterable[str]) -> int:
+        bits = self.bits
+        mask = 0
+        for upgrade_id in upgrade_ids:
+            mask |= bits.get(upgrade_id, 0)
+        return mask
+
+    def ids(self, mask: int) -> List[str]:
+        return [upgrade.id for index, upgrade in enumerate(self.upgrades) if mask >> index & 1]
+
+    def effects(self, mask: int) -> Dict[str, int]:
+        """Summed effects of every upgrade in ``mask``, memoized per mask. Do not mutate."""
+        totals = self._totals.get(mask)
+        if totals is None:
+            totals = {}
+            for index, upgrade in enumerate(self.upgrades):
+                if mask >> index & 1:
+                    for key, value in upgrade.effects.items():
+                        totals[key] = totals.get(key, 0) + value
+            self._totals[mask] = totals
+        return totals
+
+
+@dataclass(slots=True)
 class ShiftOutcome:
     wage: int
     tips: int
@@ -34,14 +88,123 @@ class ShiftOutcome:
     cash_change: int = 0
     notes: List[str] = field(default_factory=list)
 
+    def reset(
+        self,
+        wage: int,
+        tips: int,
+        energy_cost: int,
+        stress_gain: int,
+        xp_gain: int,
+        reputation_gain: int = 0,
+        cash_change: int = 0,
+    ) -> "ShiftOutcome":
+        """Reinitialize in place so one outcome can be reused across shifts."""
+        self.wage = wage
+        self.tips = tips
+        self.energy_cost = energy_cost
+        self.stress_gain = stress_gain
+        self.xp_gain = xp_gain
+        self.reputation_gain = reputation_gain
+        self.cash_change = cash_change
+        self.notes.clear()
+        return self
+
+
+# ShiftOutcome's numeric fields, in the slot order of compiled shift effects.
+OUTCOME_FIELDS = ("wage", "tips", "energy_cost", "stress_gain", "xp_gain", "reputation_gain", "cash_change")
+_OUTCOME_SLOTS = {name: slot for slot, name in enumerate(OUTCOME_FIELDS)}
+# GameState fields a story choice moves, in the slot order of its deltas.
+STORY_FIELDS = ("energy", "stress", "cash", "xp", "reputation")
+_NO_DELTAS = (0,) * len(STORY_FIELDS)
+# Floor for slots an effect leaves unbounded; far below any reachable value.
+NO_FLOOR = -(1 << 62)
+
+
+class EffectOp(NamedTuple):
+    """One declarative edit of a ``ShiftOutcome`` field: ``max(floor, int(value * factor) + delta)``."""
+
+    field: str
+    factor: float
+    delta: int
+    floor: Optional[int]
+
+
+def apply_effect_ops(ops: Tuple[EffectOp, ...], note: str, outcome: ShiftOutcome) -> None:
+    """Shared ``ShiftEvent.apply`` for events defined as ops rather than code."""
+    for field_name, factor, delta, floor in ops:
+        value = int(getattr(outcome, field_name) * factor) + delta
+        setattr(outcome, field_name, value if floor is None or value > floor else floor)
+    if note:
+        outcome.notes.append(note)
+
+
+class ShiftEffect(NamedTuple):
+    """Shift event ops compiled to one slot per ``OUTCOME_FIELDS`` entry.
+
+    Slot ``i`` maps ``value`` to ``max(floor[i], int(value * factor[i]) + delta[i])``.
+    Scalar callers use ``adds`` (``(i, delta, floor)``, factor 1) and
+    ``scales`` (``(i, factor, delta, floor)``) instead, which list only the
+    slots the event touches.
+    """
+
+    factor: Tuple[float, ...]
+    delta: Tuple[int, ...]
+    floor: Tuple[int, ...]
+    adds: Tuple[Tuple[int, int, int], ...]
+    scales: Tuple[Tuple[int, float, int, int], ...]
+    note: str
+
+
+def compile_shift_effect(ops: Tuple[EffectOp, ...], note: str = "") -> ShiftEffect:
+    factor: List[float] = [1] * len(OUTCOME_FIELDS)
+    delta = [0] * len(OUTCOME_FIELDS)
+    floor = [NO_FLOOR] * len(OUTCOME_FIELDS)
+    adds = []
+    scales = []
+    touched = 0
+    for field_name, mul, add, low in ops:
+        slot = _OUTCOME_SLOTS[field_name]
+        if touched >> slot & 1:
+            raise ValueError(f"more than one op for {field_name!r}")
+        touched |= 1 << slot
+        if low is None:
+            low = NO_FLOOR
+        factor[slot] = mul
+        delta[slot] = add
+        floor[slot] = low
+        if mul == 1:
+            adds.append((slot, add, low))
+        else:
+            scales.append((slot, mul, add, low))
+    return ShiftEffect(tuple(factor), tuple(delta), tuple(floor), tuple(adds), tuple(scales), note)
+
 
 @dataclass
 class ShiftEvent:
+    """A shift event, given as ``ops`` (compiled to ``effect``) or as an arbitrary ``apply``.
+
+    Events with ops get ``apply_effect_ops`` as their ``apply``, so callers
+    that work on a ``ShiftOutcome`` treat both kinds alike.
+    """
+
     id: str
     title: str
     text: str
-    apply: Callable[[ShiftOutcome], None]
+    apply: Optional[Callable[[ShiftOutcome], None]] = None
     weight: int = 1
+    ops: Optional[Tuple[EffectOp, ...]] = None
+    note: str = ""
+    # Compiled from ops unless given (content packs cache it precompiled).
+    effect: Optional[ShiftEffect] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.ops is not None:
+            if self.effect is None:
+                self.effect = compile_shift_effect(self.ops, self.note)
+            if self.apply is None:
+                self.apply = partial(apply_effect_ops, self.ops, self.note)
+        elif self.apply is None:
+            raise ValueError(f"shift event {self.id!r} needs ops or apply")
 
 
 @dataclass
@@ -50,6 +213,11 @@ class StoryChoice:
     label: str
     effects: Dict[str, int]
     note: str
+    # ``effects`` as one delta per ``STORY_FIELDS`` entry, fixed at construction.
+    deltas: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.deltas = tuple(map(self.effects.get, STORY_FIELDS, _NO_DELTAS))
 
 
 @dataclass
@@ -61,13 +229,152 @@ class StoryEvent:
     weight: int = 1
 
 
-@dataclass
+EventT = TypeVar("EventT", ShiftEvent, StoryEvent)
+
+
+class EventTable(Generic[EventT]):
+    """Weighted event deck with precomputed cumulative weights.
+
+    Each draw is one ``rng.uniform`` plus a bisect, so picks match the old
+    linear walk draw for draw.
+    """
+
+    def __init__(self, events: Sequence[EventT]) -> None:
+        self.events: Tuple[EventT, ...] = tuple(events)
+        self.cumulative: List[float] = list(accumulate(float(event.weight) for event in self.events))
+        self.total = self.cumulative[-1] if self.cumulative else 0.0
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def pick(self, rng: Optional[random.Random] = None) -> EventT:
+        pick = (rng or random).uniform(0, self.total)
+        index = bisect_left(self.cumulative, pick)
+        return self.events[min(index, len(self.events) - 1)]
+
+    def sample(self, k: int, rng: Optional[random.Random] = None) -> List[EventT]:
+        uniform = (rng or random).uniform
+        cumulative = self.cumulative
+        events = self.events
+        last = len(events) - 1
+        total = self.total
+        return [events[min(bisect_left(cumulative, uniform(0, total)), last)] for _ in range(k)]
+
+
+# Text for each structured log code, filled from the entry's data on render.
+LOG_TEMPLATES: Dict[str, str] = {
+    "too-exhausted": "Too exhausted to work. Crash at home first.",
+    "stress-maxed": "You freeze at the door. Stress is maxed.",
+    "commute-no-car": "No car yet. Back on the bus.",
+    "commute-bus": "Bus ride: cheap and cramped.",
+    "commute-bus-late": "Bus crawls through traffic. You arrive late.",
+    "commute-car": "You glide through neon streets in your beater car.",
+    "commute-car-breakdown": "Car coughs to a stop. Repair eats cash and time.",
+    "commute-car-traffic": "Gridlock. Horns blare. Pulse rises.",
+    "late": "Late to the shift. Tips are crushed.",
+    "shift-event": "{title}: {text}",
+    "event-note": "{text}",
+    "shift-summary": "Shift finished as {job}: +${earnings} (${wage} wage, ${tips} tips)",
+    "birthday": "You turned {age}. Service life does not slow down.",
+    "rent-paid": "Paid rent: ${rent}.",
+    "evicted": "Evicted. Cash wiped and demoted to {job}.",
+    "rest": "You crash at home and sleep. +{energy} energy, -{stress} stress.",
+    "practice-tired": "Not enough energy to practice. Rest first.",
+    "practice": "Practiced pours and recipes. -{energy} energy, +{xp} XP, +{reputation} reputation.",
+    "rent-paid-early": "Paid rent early: ${rent}. Pressure resets.",
+    "rent-short": "Need ${rent} to cover rent. Cash on hand: ${cash}.",
+    "no-such-job": "That role does not exist.",
+    "already-job": "You already wear that name tag.",
+    "needs-training": "Need the required training first.",
+    "needs-xp": "Not enough XP to impress management yet.",
+    "needs-entry-fee": "Need ${fee} to onboard.",
+    "promoted": "Promoted to {job}!",
+    "no-such-upgrade": "That upgrade does not exist.",
+    "upgrade-owned": "{upgrade} already owned.",
+    "upgrade-short": "Need ${cost} for {upgrade}.",
+    "upgrade-bought": "Bought {upgrade}. {description}",
+    "story": "{title} -> {label}: {note}",
+    "text": "{text}",
+}
+
+
+class LogEntry(NamedTuple):
+    """Structured log record: a code from ``LOG_TEMPLATES`` plus its fields.
+
+    Text is only built by ``str()``, i.e. when shown or saved.
+    """
+
+    code: str
+    data: Dict[str, object]
+
+    @classmethod
+    def text(cls, line: str) -> "LogEntry":
+        """An already rendered line, such as one read back from a save."""
+        return cls("text", {"text": line})
+
+    def __str__(self) -> str:
+        return LOG_TEMPLATES[self.code].format(**self.data)
+
+    # Saves keep rendered text, so entries compare by what they say: a state
+    # equals itself after a save round trip.
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LogEntry):
+            return NotImplemented
+        return str(self) == str(other)
+
+    def __ne__(self, other: object) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+
+@dataclass(slots=True)
 class ActionReport:
-    messages: List[str] = field(default_factory=list)
+    messages: List[LogEntry] = field(default_factory=list)
     day_advanced: bool = True
 
 
-@dataclass
+LOG_CAPACITY = 20
+
+
+class UpgradeSet(MutableSet):
+    """Owned upgrade ids: a set that iterates (and so saves) in purchase order."""
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids: Iterable[str] = ()) -> None:
+        self._ids = dict.fromkeys(ids)
+
+    def __contains__(self, upgrade_id: object) -> bool:
+        return upgrade_id in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._ids)!r})"
+
+    def add(self, upgrade_id: str) -> None:
+        self._ids[upgrade_id] = None
+
+    def discard(self, upgrade_id: str) -> None:
+        self._ids.pop(upgrade_id, None)
+
+    def update(self, ids: Iterable[str]) -> None:
+        self._ids.update(dict.fromkeys(ids))
+
+    def copy(self) -> "UpgradeSet":
+        clone = UpgradeSet.__new__(UpgradeSet)
+        clone._ids = self._ids.copy()
+        return clone
+
+
+@dataclass(slots=True)
 class GameState:
     day: int
     age: int
@@ -78,8 +385,67 @@ class GameState:
     reputation: int
     rent_progress: int
     job_id: str
-    owned_upgrades: List[str] = field(default_factory=list)
-    log: List[str] = field(default_factory=list)
+    owned_upgrades: UpgradeSet = field(default_factory=UpgradeSet)
+    log: Deque[LogEntry] = field(default_factory=deque)
+    log_capacity: int = field(default=LOG_CAPACITY, compare=False)
+    # Set while ``log`` may be shared with a clone; writers go through writable_log().
+    log_shared: bool = field(default=False, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Callers and old fixtures may pass a set, list or tuple; the engine adds to it.
+        if type(self.owned_upgrades) is not UpgradeSet:
+            self.owned_upgrades = UpgradeSet(self.owned_upgrades)
+        # Newest entry first; appendleft drops the oldest once the log is full.
+        # A deque built from a longer log would keep its tail, i.e. the oldest
+        # entries, so take the newest ``log_capacity`` explicitly. Lines loaded
+        # from a save arrive as text and become ``LogEntry`` too.
+        if not isinstance(self.log, deque) or self.log.maxlen != self.log_capacity:
+            self.log = deque(
+                (entry if isinstance(entry, LogEntry) else LogEntry.text(entry) for entry in islice(self.log, self.log_capacity)),
+                maxlen=self.log_capacity,
+            )
+
+    def writable_log(self) -> Deque[LogEntry]:
+        """The log, copied first if it is still shared with a clone."""
+        if self.log_shared:
+            self.log = deque(self.log, maxlen=self.log_capacity)
+            self.log_shared = False
+        return self.log
+
+    def clone(self) -> "GameState":
+        """Independent copy for branching; the log is shared copy-on-write."""
+        self.log_shared = True
+        return GameState(
+            self.day,
+            self.age,
+            self.energy,
+            self.stress,
+            self.cash,
+            self.xp,
+            self.reputation,
+            self.rent_progress,
+            self.job_id,
+            self.owned_upgrades.copy(),
+            self.log,
+            self.log_capacity,
+            True,
+        )
+
+    def copy_from(self, other: "GameState") -> None:
+        """Overwrite this state in place with ``other``'s values (log shared copy-on-write)."""
+        self.day = other.day
+        self.age = other.age
+        self.energy = other.energy
+        self.stress = other.stress
+        self.cash = other.cash
+        self.xp = other.xp
+        self.reputation = other.reputation
+        self.rent_progress = other.rent_progress
+        self.job_id = other.job_id
+        self.owned_upgrades = other.owned_upgrades.copy()
+        self.log = other.log
+        self.log_capacity = other.log_capacity
+        self.log_shared = other.log_shared = True
 
     def to_dict(self) -> Dict[str, object]:
         return {
@@ -93,11 +459,19 @@ class GameState:
             "rent_progress": self.rent_progress,
             "job_id": self.job_id,
             "owned_upgrades": list(self.owned_upgrades),
-            "log": list(self.log),
+            "log": [str(entry) for entry in self.log],
+            "log_capacity": self.log_capacity,
         }
 
     @classmethod
-    def from_dict(cls, data: Dict[str, object], fallback_job_id: str) -> "GameState":
+    def from_dict(
+        cls,
+        data: Dict[str, object],
+        fallback_job_id: str,
+        log_capacity: int = LOG_CAPACITY,
+    ) -> "GameState":
+        """Rebuild a state from ``to_dict`` output; ``log_capacity`` is used when the data has none."""
+        log_capacity = int(data.get("log_capacity", log_capacity))
         return cls(
             day=int(data.get("day", 1)),
             age=int(data.get("age", 21)),
@@ -108,6 +482,7 @@ class GameState:
             reputation=int(data.get("reputation", 10)),
             rent_progress=int(data.get("rent_progress", 0)),
             job_id=str(data.get("job_id", fallback_job_id)),
-            owned_upgrades=list(data.get("owned_upgrades", [])),
-            log=list(data.get("log", [])),
+            owned_upgrades=UpgradeSet(data.get("owned_upgrades", [])),
+            log=data.get("log", []),
+            log_capacity=log_capacity,
         )
@@ -0,0 +1,144 @@
+"""Opt-in call counters, wall-time totals and day-scoped cProfile captures.
+
+Set ``POUR_DECISIONS_PROFILE=1`` (or run the CLI with ``--profile``) to turn
+counting on. Engines built while it is on wrap their hot methods per
+instance, so engines built while it is off run the plain class methods and
+pay nothing. Storage functions are wrapped once at import and only read a
+module flag when counting is off.
+"""
+
+import os
+import time
+from functools import wraps
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from .engine import GameEngine
+
+ENV_VAR = "POUR_DECISIONS_PROFILE"
+ENGINE_METHODS = ("start_shift", "_resolve_commute", "_weighted_choice", "_apply_rent_pressure", "_push_log")
+
+enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+
+F = TypeVar("F", bound=Callable)
+
+
+def enable(on: bool = True) -> None:
+    """Turn counting on or off for engines built from now on and for storage calls."""
+    global enabled
+    enabled = on
+
+
+class CallStats:
+    """Call count and cumulative wall time per name."""
+
+    def __init__(self) -> None:
+        self._totals: Dict[str, List[float]] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        totals = self._totals.get(name)
+        if totals is None:
+            self._totals[name] = [1, seconds]
+        else:
+            totals[0] += 1
+            totals[1] += seconds
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {name: {"calls": int(calls), "seconds": seconds} for name, (calls, seconds) in self._totals.items()}
+
+    def clear(self) -> None:
+        self._totals.clear()
+
+
+# Process-wide totals for the storage functions.
+STORAGE_STATS = CallStats()
+
+
+def _wrap(stats: CallStats, name: str, func: Callable) -> Callable:
+    @wraps(func)
+    def timed_call(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats.record(name, time.perf_counter() - start)
+
+    return timed_call
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Count calls to a module-level function into ``STORAGE_STATS`` while counting is on."""
+
+    def decorate(func: F) -> F:
+        @wraps(func)
+        def call(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STORAGE_STATS.record(name, time.perf_counter() - start)
+
+        return call  # type: ignore[return-value]
+
+    return decorate
+
+
+def instrument(engine: "GameEngine", stats: CallStats) -> None:
+    """Shadow ``ENGINE_METHODS`` on this one engine with counting wrappers."""
+    for name in ENGINE_METHODS:
+        setattr(engine, name, _wrap(stats, name, getattr(engine, name)))
+
+
+class DayProfile:
+    """cProfile capture that stops by itself after ``days`` simulated days.
+
+    The engine's ``_advance_day`` is shadowed for the duration of the
+    capture only, on top of any wrapper already there (an
+    ``export.DayRecorder``, say). With ``path``, stats are dumped there when
+    it stops.
+    """
+
+    def __init__(self, engine: "GameEngine", days: int, path: Optional[str] = None) -> None:
+        self.engine = engine
+        self.stop_day = engine.state.day + days
+        self.path = path
+        self.done = False
+        import cProfile
+
+        self.profile = cProfile.Profile()
+        # Whatever instance attribute is shadowed (e.g. an export.DayRecorder wrapper) goes back on stop.
+        self._previous = engine.__dict__.get("_advance_day")
+        advance_day = engine._advance_day
+
+        def advance_and_check(rent_increment, messages):
+            advance_day(rent_increment, messages)
+            if engine.state.day >= self.stop_day:
+                self.stop()
+
+        self._advance_and_check = engine._advance_day = advance_and_check
+        self.profile.enable()
+
+    def stop(self) -> None:
+        if self.done:
+            return
+        self.profile.disable()
+        self.done = True
+        # Only unwind if nothing shadowed this wrapper since; otherwise it stays
+        # in the chain as a pass-through.
+        if self.engine.__dict__.get("_advance_day") is self._advance_and_check:
+            if self._previous is None:
+                del self.engine._advance_day
+            else:
+                self.engine._advance_day = self._previous
+        if self.path:
+            self.profile.dump_stats(self.path)
+
+    def report(self, limit: int = 20, sort: str = "cumulative") -> str:
+        import io
+        import pstats
+
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
@@ -0,0 +1,456 @@
+"""Asyncio game server: many players in one process, one ``GameEngine`` each.
+
+Line protocol over TCP or a UNIX socket. Every command line gets exactly
+one JSON line back, ``{"ok": true, ...}`` or ``{"ok": false, "error": ...}``::
+
+    login <slot>        load (or start) the career saved in <slot>
+    status              current stats
+    shift [bus|car]     work a shift
+    rest | practice
+    shop                upgrades for sale
+    buy <upgrade-id>
+    jobs                the career ladder
+    promote <job-id>
+    rent                pay rent early
+    log                 recent feed
+    choose <n> | skip   answer the story event offered by the last action
+    save                write now instead of at the next flush
+    quit
+
+Careers live in a ``SlotStore``. Loads and saves run on one I/O thread so
+the event loop never touches the database. Saves are coalesced: an action
+only marks its slot dirty, and a periodic flush writes the latest state of
+every dirty slot in one batch. Sessions are plain ``asyncio.Protocol``
+objects with no task per connection, and every engine draws from one shared
+RNG, so an idle session costs little more than its transport.
+
+Run ``python -m pour_decisions.server --port 7878`` (or ``--unix PATH``) and
+talk to it with ``nc``, or with ``Client`` from code.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from . import data
+from .engine import GameEngine
+from .models import ActionReport, GameState, StoryEvent
+from .storage import SlotStore
+
+logger = logging.getLogger(__name__)
+
+Reply = Dict[str, object]
+
+MAX_LINE = 1024
+MAX_SLOT = 64
+
+
+def _status(engine: GameEngine) -> Reply:
+    state = engine.state
+    return {
+        "day": state.day,
+        "age": state.age,
+        "energy": state.energy,
+        "stress": state.stress,
+        "cash": state.cash,
+        "xp": state.xp,
+        "reputation": state.reputation,
+        "rent_progress": state.rent_progress,
+        "job": state.job_id,
+        "rent": engine.current_job.rent,
+        "upgrades": sorted(state.owned_upgrades),
+    }
+
+
+def _error(message: str) -> Reply:
+    return {"ok": False, "error": message}
+
+
+class Session(asyncio.Protocol):
+    """One connection. Commands run one at a time, in order."""
+
+    __slots__ = ("server", "transport", "buffer", "slot", "engine", "story", "busy")
+
+    def __init__(self, server: "GameServer") -> None:
+        self.server = server
+        self.transport: Optional[asyncio.Transport] = None
+        self.buffer = b""
+        self.slot: Optional[str] = None
+        self.engine: Optional[GameEngine] = None
+        self.story: Optional[StoryEvent] = None
+        self.busy = False
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport
+        self.server.connections.add(self)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.server.connections.discard(self)
+        if self.slot is not None:
+            self.server.release(self)
+
+    def data_received(self, chunk: bytes) -> None:
+        self.buffer += chunk
+        while not self.busy and self.transport is not None and not self.transport.is_closing():
+            line, newline, rest = self.buffer.partition(b"\n")
+            if not newline:
+                if len(self.buffer) > MAX_LINE:
+                    self.send(_error("line too long"))
+                    self.transport.close()
+                break
+            self.buffer = rest
+            self.handle(line.decode("utf-8", "replace").strip())
+
+    def send(self, reply: Reply) -> None:
+        self.transport.write(json.dumps(reply, separators=(",", ":")).encode("utf-8") + b"\n")
+
+    def handle(self, line: str) -> None:
+        command, _, arg = line.partition(" ")
+        command, arg = command.lower(), arg.strip()
+        if not command:
+            return
+        if command == "login":
+            self.login(arg)
+            return
+        if command == "quit":
+            self.send({"ok": True})
+            self.transport.close()
+            return
+        handler = COMMANDS.get(command)
+        if handler is None:
+            self.send(_error(f"unknown command {command!r}"))
+        elif self.engine is None:
+            self.send(_error("login first"))
+        else:
+            reply = handler(self, arg)
+            if reply is not None:
+                self.send(reply)
+
+    def login(self, slot: str) -> None:
+        if self.slot is not None:
+            self.send(_error(f"already playing {self.slot!r}"))
+        elif not slot or len(slot) > MAX_SLOT or not slot.isprintable() or " " in slot:
+            self.send(_error("usage: login <slot>"))
+        elif slot in self.server.sessions:
+            self.send(_error(f"slot {slot!r} is in use"))
+        else:
+            self.slot = slot
+            self.server.sessions[slot] = self
+            self.wait_for(self._login(slot))
+
+    def wait_for(self, reply: Awaitable[Optional[Reply]]) -> None:
+        """Hold further commands (and reading) until ``reply`` is ready, then send it."""
+        self.busy = True
+        self.transport.pause_reading()
+        self.server.spawn(self._resume_after(reply))
+
+    async def _resume_after(self, reply: Awaitable[Optional[Reply]]) -> None:
+        try:
+            result = await reply
+        except Exception as exc:  # noqa: BLE001 - reported to the client, session stays usable
+            result = _error(str(exc))
+        if self.transport.is_closing():
+            return
+        if result is not None:
+            self.send(result)
+        self.busy = False
+        self.transport.resume_reading()
+        self.data_received(b"")
+
+    async def _login(self, slot: str) -> Optional[Reply]:
+        try:
+            state = await self.server.load(slot)
+        except Exception as exc:  # noqa: BLE001
+            if self.slot == slot:
+                self.server.sessions.pop(slot, None)
+                self.slot = None
+            return _error(f"could not load {slot!r}: {exc}")
+        if self.slot != slot:
+            return None  # disconnected while loading; release() already ran
+        self.engine = GameEngine(state, rng=self.server.rng)
+        return {"ok": True, "slot": slot, "status": _status(self.engine)}
+
+    # Commands, one per protocol verb.
+
+    def _acted(self, report: ActionReport) -> Reply:
+        self.server.mark_dirty(self.slot, self.engine.state)
+        reply: Reply = {
+            "ok": True,
+            "messages": [str(message) for message in report.messages],
+            "day_advanced": report.day_advanced,
+            "status": _status(self.engine),
+        }
+        self.story = self.engine.pick_story_event()
+        if self.story is not None:
+            reply["story"] = {
+                "id": self.story.id,
+                "title": self.story.title,
+                "text": self.story.text,
+                "choices": [choice.label for choice in self.story.choices],
+            }
+        return reply
+
+    def do_status(self, arg: str) -> Reply:
+        return {"ok": True, "status": _status(self.engine)}
+
+    def do_shift(self, arg: str) -> Reply:
+        mode = arg.lower() or "bus"
+        if mode not in ("bus", "car"):
+            return _error("usage: shift [bus|car]")
+        if mode == "car" and not self.engine.has_upgrade("car"):
+            mode = "bus"
+        return self._acted(self.engine.start_shift(mode))
+
+    def do_rest(self, arg: str) -> Reply:
+        return self._acted(self.engine.rest())
+
+    def do_practice(self, arg: str) -> Reply:
+        return self._acted(self.engine.practice())
+
+    def do_shop(self, arg: str) -> Reply:
+        owned = self.engine.state.owned_upgrades
+        upgrades = [
+            {"id": upgrade.id, "name": upgrade.name, "cost": upgrade.cost, "description": upgrade.description}
+            for upgrade in data.UPGRADES
+            if upgrade.id not in owned
+        ]
+        return {"ok": True, "upgrades": upgrades}
+
+    def do_buy(self, arg: str) -> Reply:
+        if arg not in data.UPGRADES_BY_ID:
+            return _error(f"unknown upgrade {arg!r}")
+        report = self.engine.purchase_upgrade(arg)
+        self.server.mark_dirty(self.slot, self.engine.state)
+        return {"ok": True, "messages": [str(message) for message in report.messages], "status": _status(self.engine)}
+
+    def do_jobs(self, arg: str) -> Reply:
+        jobs = [
+            {
+                "id": job.id,
+                "title": job.title,
+                "pay_range": list(job.pay_range),
+                "rent": job.rent,
+                "xp_required": job.xp_required,
+                "entry_fee": job.entry_fee,
+                "requires": job.requires,
+            }
+            for job in data.JOBS
+        ]
+        return {"ok": True, "jobs": jobs, "current": self.engine.state.job_id}
+
+    def do_promote(self, arg: str) -> Reply:
+        if arg not in data.JOBS_BY_ID:
+            return _error(f"unknown job {arg!r}")
+        report = self.engine.request_promotion(arg)
+        self.server.mark_dirty(self.slot, self.engine.state)
+        return {"ok": True, "messages": [str(message) for message in report.messages], "status": _status(self.engine)}
+
+    def do_rent(self, arg: str) -> Reply:
+        return self._acted(self.engine.pay_rent_now())
+
+    def do_log(self, arg: str) -> Reply:
+        return {"ok": True, "log": [str(entry) for entry in self.engine.state.log]}
+
+    def do_choose(self, arg: str) -> Reply:
+        event, self.story = self.story, None
+        if event is None:
+            return _error("no story event to answer")
+        try:
+            choice = event.choices[int(arg) - 1]
+        except (ValueError, IndexError):
+            return _error("Invalid choice. Event slips by.")
+        report = self.engine.apply_story_choice(event, choice)
+        self.server.mark_dirty(self.slot, self.engine.state)
+        return {"ok": True, "messages": [str(message) for message in report.messages], "status": _status(self.engine)}
+
+    def do_skip(self, arg: str) -> Reply:
+        self.story = None
+        return {"ok": True, "messages": ["You let the moment pass."]}
+
+    def do_save(self, arg: str) -> None:
+        self.server.mark_dirty(self.slot, self.engine.state)
+        self.wait_for(self._saved())
+
+    async def _saved(self) -> Reply:
+        await self.server.flush()
+        return {"ok": True}
+
+
+# Handlers return the reply, or None when they answer later via ``wait_for``.
+COMMANDS: Dict[str, Callable[[Session, str], Optional[Reply]]] = {
+    name[3:]: method for name, method in vars(Session).items() if name.startswith("do_")
+}
+
+
+class GameServer:
+    """Sessions, the slot store and the save flusher for one listening socket."""
+
+    def __init__(self, db_path: Optional[Path] = None, save_interval: float = 1.0) -> None:
+        self.db_path = db_path
+        self.save_interval = save_interval
+        self.rng = random.Random()
+        self.connections: Set[Session] = set()
+        self.sessions: Dict[str, Session] = {}
+        # Slot -> live state with changes not yet handed to the I/O thread.
+        self._dirty: Dict[str, GameState] = {}
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pour-decisions-io")
+        self._store: Optional[SlotStore] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def _run_io(self, func: Callable, *args: object) -> object:
+        return await asyncio.get_running_loop().run_in_executor(self._io, func, *args)
+
+    async def _start(self) -> None:
+        self._store = await self._run_io(SlotStore, self.db_path)
+        self._flusher = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 7878) -> asyncio.AbstractServer:
+        await self._start()
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(lambda: Session(self), host, port, backlog=1024)
+        return self._server
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        await self._start()
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_unix_server(lambda: Session(self), path, backlog=1024)
+        return self._server
+
+    def spawn(self, coroutine) -> None:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def load(self, slot: str) -> GameState:
+        # A player who reconnects before the next flush gets the unsaved state.
+        state = self._dirty.get(slot)
+        if state is None:
+            state = await self._run_io(self._store.load, slot) or data.initial_state()
+        return state
+
+    def mark_dirty(self, slot: str, state: GameState) -> None:
+        self._dirty[slot] = state
+
+    def release(self, session: Session) -> None:
+        """Forget a finished session; its state stays queued for the next flush."""
+        if self.sessions.get(session.slot) is session:
+            del self.sessions[session.slot]
+        if session.engine is not None:
+            self.mark_dirty(session.slot, session.engine.state)
+        session.slot = session.engine = session.story = None
+
+    async def flush(self) -> int:
+        """Write every dirty slot in one batch on the I/O thread; returns how many were written."""
+        if not self._dirty:
+            return 0
+        # Clones are cheap (the log is shared copy-on-write) and keep the
+        # I/O thread off states the loop goes on mutating.
+        batch = {slot: state.clone() for slot, state in self._dirty.items()}
+        self._dirty.clear()
+        try:
+            return await self._run_io(self._write, batch)
+        except BaseException:
+            for slot, state in batch.items():
+                self._dirty.setdefault(slot, state)
+            raise
+
+    def _write(self, batch: Dict[str, GameState]) -> int:
+        written = sum(self._store.save(slot, state) for slot, state in batch.items())
+        self._store.commit()
+        return written
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.save_interval)
+            try:
+                await self.flush()
+            except Exception:  # noqa: BLE001 - keep serving; the states stay dirty
+                logger.exception("save failed, will retry")
+
+    async def close(self) -> None:
+        """Stop listening, drop connections, write everything and close the store."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for session in list(self.connections):
+            session.transport.close()
+        await asyncio.sleep(0)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._flusher is not None:
+            self._flusher.cancel()
+        for session in list(self.sessions.values()):
+            self.release(session)
+        await self.flush()
+        await self._run_io(self._store.close)
+        self._io.shutdown()
+
+
+class Client:
+    """Minimal protocol client, for tests, bots and load generation."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 7878) -> "Client":
+        return cls(*await asyncio.open_connection(host, port))
+
+    @classmethod
+    async def connect_unix(cls, path: str) -> "Client":
+        return cls(*await asyncio.open_unix_connection(path))
+
+    async def send(self, command: str) -> Reply:
+        self.writer.write(command.encode("utf-8") + b"\n")
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = GameServer(args.db, args.save_interval)
+    if args.unix:
+        listener = await server.start_unix(args.unix)
+        where = args.unix
+    else:
+        listener = await server.start_tcp(args.host, args.port)
+        where = f"{args.host}:{args.port}"
+    print(f"Pour Decisions server on {where} (Ctrl+C to stop)")
+    try:
+        await listener.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pour Decisions multi-session server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7878)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a UNIX socket instead of TCP")
+    parser.add_argument("--db", type=Path, default=None, help="slot database (default: saves.db)")
+    parser.add_argument("--save-interval", type=float, default=1.0, help="seconds between coalesced saves")
+    args = parser.parse_args(argv)
+    logging.basicConfig(format="pour-decisions server: %(message)s")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
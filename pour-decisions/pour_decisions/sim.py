@@ -0,0 +1,182 @@
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .data import initial_state
+from .engine import GameEngine
+from .models import ActionReport, GameState
+
+Policy = Callable[[GameEngine], str]
+
+
+class DaySnapshot(NamedTuple):
+    day: int
+    cash: int
+    energy: int
+    stress: int
+    xp: int
+    reputation: int
+    rent_progress: int
+    job_id: str
+    action: str
+
+
+def _shift_bus(engine: GameEngine) -> ActionReport:
+    return engine.start_shift("bus")
+
+
+def _shift_car(engine: GameEngine) -> ActionReport:
+    return engine.start_shift("car")
+
+
+def _rest(engine: GameEngine) -> ActionReport:
+    return engine.rest()
+
+
+def _practice(engine: GameEngine) -> ActionReport:
+    return engine.practice()
+
+
+# Actions go through the instance so per-engine wrappers (profiling, export) see them.
+ACTIONS: Dict[str, Callable[[GameEngine], ActionReport]] = {
+    "shift-bus": _shift_bus,
+    "shift-car": _shift_car,
+    "rest": _rest,
+    "practice": _practice,
+}
+
+
+def perform(engine: GameEngine, action: str) -> ActionReport:
+    """Run an ``ACTIONS`` name, ``buy:<upgrade id>`` or ``promote:<job id>`` on ``engine``."""
+    kind, _, target = action.partition(":")
+    if kind == "buy":
+        return engine.purchase_upgrade(target)
+    if kind == "promote":
+        return engine.request_promotion(target)
+    return ACTIONS[kind](engine)
+
+
+def grind_policy(engine: GameEngine) -> str:
+    state = engine.state
+    if state.energy < 30 or state.stress > 80:
+        return "rest"
+    return "shift-car" if engine.has_upgrade("car") else "shift-bus"
+
+
+def run_policy(
+    policy: Policy,
+    days: int,
+    state: Optional[GameState] = None,
+    rng: Optional[random.Random] = None,
+    profile: Optional[bool] = None,
+) -> List[DaySnapshot]:
+    """Drive a headless engine for ``days`` days and return one snapshot per day.
+
+    The policy picks an action name from ``ACTIONS``. Actions that do not
+    advance the day (too exhausted, too stressed) fall back to resting so the
+    run always makes progress. ``profile`` is passed to the engine.
+    """
+    engine = GameEngine(state, headless=True, rng=rng, profile=profile)
+    state = engine.state
+    trajectory: List[DaySnapshot] = []
+    last_day = state.day + days
+    while state.day < last_day:
+        action = policy(engine)
+        day = state.day
+        ACTIONS[action](engine)
+        if state.day == day:
+            action = "rest"
+            engine.rest()
+        trajectory.append(
+            DaySnapshot(
+                state.day,
+                state.cash,
+                state.energy,
+                state.stress,
+                state.xp,
+                state.reputation,
+                state.rent_progress,
+                state.job_id,
+                action,
+            )
+        )
+    return trajectory
+
+
+@dataclass
+class CareerStats:
+    careers: int = 0
+    total_cash: int = 0
+    total_xp: int = 0
+    total_reputation: int = 0
+    broke: int = 0
+    final_jobs: Counter = field(default_factory=Counter)
+
+    def add(self, state: GameState) -> None:
+        self.careers += 1
+        self.total_cash += state.cash
+        self.total_xp += state.xp
+        self.total_reputation += state.reputation
+        self.broke += state.cash <= 0
+        self.final_jobs[state.job_id] += 1
+
+    def merge(self, other: "CareerStats") -> None:
+        self.careers += other.careers
+        self.total_cash += other.total_cash
+        self.total_xp += other.total_xp
+        self.total_reputation += other.total_reputation
+        self.broke += other.broke
+        self.final_jobs.update(other.final_jobs)
+
+    @property
+    def mean_cash(self) -> float:
+        return self.total_cash / self.careers if self.careers else 0.0
+
+    @property
+    def mean_xp(self) -> float:
+        return self.total_xp / self.careers if self.careers else 0.0
+
+
+def career_seed(seed: int, career: int) -> int:
+    """Seed for one career, independent of how careers are sharded."""
+    return (seed << 32) ^ career
+
+
+def _run_shard(policy: Policy, days: int, seed: int, start: int, stop: int) -> CareerStats:
+    stats = CareerStats()
+    for career in range(start, stop):
+        state = initial_state()
+        run_policy(policy, days, state, random.Random(career_seed(seed, career)))
+        stats.add(state)
+    return stats
+
+
+def run_careers(
+    policy: Policy,
+    careers: int,
+    days: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+) -> CareerStats:
+    """Simulate ``careers`` independent careers across a process pool.
+
+    Each career gets its own RNG derived from ``seed`` and its index, so the
+    merged stats are identical for any ``workers`` count. ``policy`` must be
+    picklable (a module-level function).
+    """
+    workers = workers or os.cpu_count() or 1
+    shard_size = -(-careers // workers) if careers else 0
+    bounds = [(start, min(start + shard_size, careers)) for start in range(0, careers, shard_size or 1)]
+    stats = CareerStats()
+    if workers == 1:
+        for start, stop in bounds:
+            stats.merge(_run_shard(policy, days, seed, start, stop))
+        return stats
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_shard, policy, days, seed, start, stop) for start, stop in bounds]
+        for future in futures:
+            stats.merge(future.result())
+    return stats
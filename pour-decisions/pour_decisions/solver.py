@@ -0,0 +1,310 @@
+"""Value iteration over a discretized career state space.
+
+Requires NumPy (``pip install pour-decisions[batch]``). ``solve`` builds the
+transition model from ``analysis.day_distribution`` (the engine's own shift,
+rest and practice rules) and finds the action that maximizes discounted cash
+flow from every grid state: a day action, buying one of the candidate
+upgrades, or requesting a promotion. The result is a ``PolicyTable`` whose
+lookups are a single array index, and which can be saved and reloaded.
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .analysis import DAY_ACTIONS, action_allowed, day_distribution, rent_increment
+from .data import JOB_INDEX, JOBS, UPGRADES_BY_ID
+from .engine import GameEngine
+from .models import ActionReport, GameState
+from .sim import perform
+
+
+@dataclass(frozen=True)
+class Grid:
+    """Grid spacing for each state axis. Cash above ``cash_cap`` is treated as ``cash_cap``."""
+
+    energy_step: int = 20
+    stress_step: int = 20
+    rent_step: int = 25
+    cash_step: int = 100
+    cash_cap: int = 2000
+    xp_step: int = 100
+
+    def __post_init__(self) -> None:
+        if 120 % self.energy_step or 140 % self.stress_step or 100 % self.rent_step:
+            raise ValueError("energy, stress and rent steps must divide 120, 140 and 100")
+        if self.rent_step < 15 or self.cash_cap % self.cash_step:
+            raise ValueError("rent_step must be at least 15 and cash_cap a multiple of cash_step")
+
+    @property
+    def xp_cap(self) -> int:
+        top = max(job.xp_required for job in JOBS)
+        return -(-top // self.xp_step) * self.xp_step
+
+    @property
+    def shape(self) -> Tuple[int, int, int, int, int]:
+        """Sizes of the (energy, stress, rent, cash, xp) axes."""
+        return (
+            120 // self.energy_step + 1,
+            140 // self.stress_step + 1,
+            100 // self.rent_step,
+            self.cash_cap // self.cash_step + 1,
+            self.xp_cap // self.xp_step + 1,
+        )
+
+    def index(self, state: GameState) -> Tuple[int, int, int, int, int]:
+        """Grid point of ``state``, rounded so every check it passes also passes in the engine.
+
+        Energy, cash and XP round down and stress rounds up; rent progress
+        rounds to the nearest point.
+        """
+        energies, stresses, rents, cashes, xps = self.shape
+        return (
+            min(energies - 1, max(0, state.energy // self.energy_step)),
+            min(stresses - 1, max(0, -(-state.stress // self.stress_step))),
+            min(rents - 1, max(0, round(state.rent_progress / self.rent_step))),
+            min(cashes - 1, max(0, state.cash // self.cash_step)),
+            min(xps - 1, max(0, state.xp // self.xp_step)),
+        )
+
+
+def _split(value: float, step: int) -> List[Tuple[int, float]]:
+    """Split ``value`` between its two neighbouring grid points (in steps), preserving the mean."""
+    low = int(value // step)
+    fraction = value / step - low
+    if fraction < 1e-12:
+        return [(low, 1.0)]
+    return [(low, 1.0 - fraction), (low + 1, fraction)]
+
+
+# (probability, energy shift, stress shift, xp shift, rent shift, mean cash delta)
+Outcome = Tuple[float, int, int, int, int, float]
+
+
+def _outcomes(job: int, upgrades: frozenset, action: str, grid: Grid) -> List[Outcome]:
+    """Day outcomes of ``action`` with vitals, XP and rent deltas split onto the grid."""
+    merged: Dict[Tuple[int, int, int, int], List[float]] = {}
+    rent_shifts = _split(rent_increment(upgrades, action), grid.rent_step)
+    for result, p in day_distribution(job, upgrades, action).items():
+        for energy, p_energy in _split(-result.energy_cost, grid.energy_step):
+            for stress, p_stress in _split(result.stress_gain, grid.stress_step):
+                for xp, p_xp in _split(result.xp_gain, grid.xp_step):
+                    for rent, p_rent in rent_shifts:
+                        q = p * p_energy * p_stress * p_xp * p_rent
+                        totals = merged.setdefault((energy, stress, xp, rent), [0.0, 0.0])
+                        totals[0] += q
+                        totals[1] += q * result.earnings
+    return [(p, *shifts, cash / p) for shifts, (p, cash) in merged.items() if p > 0]
+
+
+def _cash_split(cash: np.ndarray, grid: Grid) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Lower grid index, upper grid index and upper weight for exact cash amounts."""
+    position = np.clip(cash, 0, grid.cash_cap) / grid.cash_step
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, grid.cash_cap // grid.cash_step)
+    return low, high, position - low
+
+
+class PolicyTable:
+    """Best action and value for every grid state, indexed by (job, upgrade mask, *grid axes).
+
+    Bit ``i`` of the mask is ``candidates[i]``; upgrades in ``owned`` are
+    assumed held everywhere and any others are ignored on lookup.
+    """
+
+    def __init__(
+        self,
+        actions: Tuple[str, ...],
+        policy: np.ndarray,
+        values: np.ndarray,
+        grid: Grid,
+        candidates: Tuple[str, ...],
+        owned: Tuple[str, ...],
+    ) -> None:
+        self.actions = actions
+        self.policy = policy
+        self.values = values
+        self.grid = grid
+        self.candidates = candidates
+        self.owned = owned
+        self._bits = {upgrade_id: 1 << bit for bit, upgrade_id in enumerate(candidates)}
+
+    def index(self, state: GameState) -> Tuple[int, ...]:
+        mask = 0
+        for upgrade_id in state.owned_upgrades:
+            mask |= self._bits.get(upgrade_id, 0)
+        return (JOB_INDEX.get(state.job_id, 0), mask, *self.grid.index(state))
+
+    def action(self, state: GameState) -> str:
+        return self.actions[self.policy[self.index(state)]]
+
+    def value(self, state: GameState) -> float:
+        return float(self.values[self.index(state)])
+
+    def act(self, engine: GameEngine) -> ActionReport:
+        """Run the table's action for ``engine.state`` on ``engine``."""
+        return perform(engine, self.action(engine.state))
+
+    def save(self, path: Path) -> None:
+        meta = {
+            "actions": self.actions,
+            "grid": asdict(self.grid),
+            "candidates": self.candidates,
+            "owned": self.owned,
+        }
+        with Path(path).open("wb") as handle:
+            np.savez_compressed(handle, policy=self.policy, values=self.values, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path: Path) -> "PolicyTable":
+        with np.load(Path(path)) as archive:
+            meta = json.loads(str(archive["meta"]))
+            return cls(
+                tuple(meta["actions"]),
+                archive["policy"],
+                archive["values"],
+                Grid(**meta["grid"]),
+                tuple(meta["candidates"]),
+                tuple(meta["owned"]),
+            )
+
+
+def solve(
+    candidates: Iterable[str] = ("mixology-course",),
+    owned: Iterable[str] = (),
+    grid: Optional[Grid] = None,
+    gamma: float = 0.97,
+    tolerance: float = 0.5,
+    max_sweeps: int = 2000,
+    eviction_penalty: float = 0.0,
+) -> PolicyTable:
+    """Value iteration for the action maximizing discounted cash flow.
+
+    Each day's reward is the change in cash (wages and tips minus rent, the
+    practice fee, and everything lost to eviction) less
+    ``eviction_penalty`` per eviction; upgrades and promotions take effect
+    on the same day and cost their price. The table grows by 2x per
+    candidate upgrade, so keep ``candidates`` to the purchases worth
+    deciding on. Sweeps stop once no value moves by more than
+    ``tolerance``.
+    """
+    grid = grid or Grid()
+    candidates = tuple(upgrade_id for upgrade_id in candidates if upgrade_id in UPGRADES_BY_ID)
+    owned = tuple(sorted(set(owned) - set(candidates)))
+    masks = 1 << len(candidates)
+    energies, stresses, rents, cashes, xps = grid.shape
+    shape = (len(JOBS), masks, energies, stresses, rents, cashes, xps)
+    actions = (
+        DAY_ACTIONS
+        + tuple(f"buy:{upgrade_id}" for upgrade_id in candidates)
+        + tuple(f"promote:{job.id}" for job in JOBS)
+    )
+    buy_code = len(DAY_ACTIONS)
+    promote_code = buy_code + len(candidates)
+
+    energy_axis = np.arange(energies)
+    stress_axis = np.arange(stresses)
+    rent_axis = np.arange(rents)[:, None]
+    cash = (np.arange(cashes) * grid.cash_step)[None, :]
+    xp_axis = np.arange(xps)
+    strides = [int(np.prod(shape[axis + 1 :])) for axis in range(len(shape))]
+    job_stride, mask_stride, energy_stride, stress_stride, rent_stride, cash_stride, xp_stride = strides
+
+    def upgrades_for(mask: int) -> frozenset:
+        return frozenset(owned) | {candidates[bit] for bit in range(len(candidates)) if mask >> bit & 1}
+
+    # Per (job, mask, action): allowed (energy, stress) cells and the grid outcomes.
+    moves = []
+    for job in range(len(JOBS)):
+        for mask in range(masks):
+            upgrades = upgrades_for(mask)
+            for code, action in enumerate(DAY_ACTIONS):
+                # Like advisor.legal_actions: the engine would let a car commute
+                # without a car through at no commute cost, but players cannot.
+                if action == "shift-car" and "car" not in upgrades:
+                    continue
+                allowed = np.array(
+                    [
+                        [action_allowed(upgrades, action, e * grid.energy_step, s * grid.stress_step) for s in stress_axis]
+                        for e in energy_axis
+                    ]
+                )
+                if allowed.any():
+                    moves.append((job, mask, code, allowed, _outcomes(job, upgrades, action, grid)))
+
+    values = np.zeros(shape)
+    policy = np.zeros(shape, dtype=np.min_scalar_type(len(actions) - 1))
+    for _ in range(max_sweeps):
+        flat = values.ravel()
+        best = np.full(shape, -np.inf)
+        for job, mask, code, allowed, outcomes in moves:
+            rent_due = JOBS[job].rent
+            q = np.zeros((energies, stresses, rents, cashes, xps))
+            for p, energy, stress, xp, rent, cash_delta in outcomes:
+                # Rent and cash interact (payment, eviction); the other axes move independently.
+                rent_raw = rent_axis + rent
+                exact = cash + cash_delta
+                pay = rent_raw >= rents
+                evicted = pay & (exact < rent_due)
+                after = np.where(evicted, 0.0, exact - pay * rent_due)
+                rent_after = np.where(evicted, 0, rent_raw - pay * rents)
+                low, high, weight = _cash_split(after, grid)
+                base = (
+                    np.where(evicted, 0, job) * job_stride
+                    + mask * mask_stride
+                    + rent_after * rent_stride
+                )
+                others = (
+                    np.clip(energy_axis + energy, 0, energies - 1)[:, None, None, None, None] * energy_stride
+                    + np.clip(stress_axis + stress, 0, stresses - 1)[None, :, None, None, None] * stress_stride
+                    + np.minimum(xp_axis + xp, xps - 1)[None, None, None, None, :] * xp_stride
+                )
+                weight = weight[None, None, :, :, None]
+                following = flat[others + (base + low * cash_stride)[None, None, :, :, None]] * (1.0 - weight)
+                following += flat[others + (base + high * cash_stride)[None, None, :, :, None]] * weight
+                reward = after - cash - eviction_penalty * evicted
+                q += p * (reward[None, None, :, :, None] + gamma * following)
+            q[~allowed] = -np.inf
+            block = best[job, mask]
+            better = q > block
+            block[better] = q[better]
+            policy[job, mask][better] = code
+
+        # Purchases and promotions do not advance the day, so they are undiscounted.
+        for bit, upgrade_id in enumerate(candidates):
+            cost = UPGRADES_BY_ID[upgrade_id].cost
+            low, high, weight = _cash_split(cash[0] - cost, grid)
+            affordable = cash[0] >= cost
+            for mask in range(masks):
+                if mask >> bit & 1:
+                    continue
+                target = values[:, mask | 1 << bit]
+                q = -cost + target[..., low, :] * (1.0 - weight[:, None]) + target[..., high, :] * weight[:, None]
+                q[..., ~affordable, :] = -np.inf
+                better = q > best[:, mask]
+                best[:, mask][better] = q[better]
+                policy[:, mask][better] = buy_code + bit
+        for target_job, job in enumerate(JOBS):
+            low, high, weight = _cash_split(cash[0] - job.entry_fee, grid)
+            affordable = cash[0] >= job.entry_fee
+            qualified = xp_axis * grid.xp_step >= job.xp_required
+            for mask in range(masks):
+                if job.requires and job.requires not in upgrades_for(mask):
+                    continue
+                target = values[target_job, mask]
+                q = -job.entry_fee + target[..., low, :] * (1.0 - weight[:, None]) + target[..., high, :] * weight[:, None]
+                q[..., ~affordable, :] = -np.inf
+                q[..., ~qualified] = -np.inf
+                for current in range(target_job):
+                    better = q > best[current, mask]
+                    best[current, mask][better] = q[better]
+                    policy[current, mask][better] = promote_code + target_job
+
+        change = np.abs(best - values).max()
+        values = best
+        if change <= tolerance:
+            break
+    return PolicyTable(actions, policy, values.astype(np.float32), grid, candidates, owned)
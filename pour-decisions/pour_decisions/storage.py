@@ -1,24 +1,605 @@
+import atexit
 import json
+import os
+import random
+import struct
+import tempfile
+import threading
+import zlib
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
-from .data import JOBS, initial_state
-from .models import GameState
+from . import data
+from .data import initial_state
+from .engine import GameEngine
+from .models import ActionReport, GameState
+from .profiling import timed
 
 SAVE_PATH = Path(__file__).resolve().parent.parent / "savegame.json"
+DB_PATH = SAVE_PATH.with_name("saves.db")
 
+# Binary save layout (little-endian):
+#   magic, u16 version,
+#   i32 day, age, energy, stress, i64 cash, xp, i32 reputation, rent_progress,
+#   u16-prefixed job id, u16 upgrade count + u16-prefixed ids,
+#   u32 log capacity, u32 log count + u32-prefixed lines.
+# Strings are UTF-8.
+BINARY_MAGIC = b"PDSV"
+BINARY_VERSION = 1
+_HEADER = struct.Struct("<4sH")
+_SCALARS = struct.Struct("<iiiiqqii")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
 
-def load_state(path: Optional[Path] = None) -> GameState:
+# Journal record: u32 seq, u8 action (index into JOURNAL_ACTIONS), two u16
+# arguments (commute mode, or job, upgrade, or story event and choice index),
+# u32 shift RNG seed, then a u32 CRC-32 of those 13 bytes.
+_RECORD = struct.Struct("<IBHHI")
+RECORD_SIZE = _RECORD.size + 4
+JOURNAL_ACTIONS = (
+    "start_shift",
+    "rest",
+    "practice",
+    "pay_rent_now",
+    "request_promotion",
+    "purchase_upgrade",
+    "apply_story_choice",
+)
+COMMUTE_MODES = ("bus", "car")
+
+# Last payload written to (or read from) each save file, used to skip writes
+# when the state has not changed since.
+_last_saved: Dict[Path, bytes] = {}
+
+
+def encode_binary(state: GameState) -> bytes:
+    parts: List[bytes] = [
+        _HEADER.pack(BINARY_MAGIC, BINARY_VERSION),
+        _SCALARS.pack(
+            state.day,
+            state.age,
+            state.energy,
+            state.stress,
+            state.cash,
+            state.xp,
+            state.reputation,
+            state.rent_progress,
+        ),
+    ]
+    job_id = state.job_id.encode("utf-8")
+    parts.append(_U16.pack(len(job_id)) + job_id)
+    upgrades = list(state.owned_upgrades)
+    parts.append(_U16.pack(len(upgrades)))
+    for upgrade_id in upgrades:
+        raw = upgrade_id.encode("utf-8")
+        parts.append(_U16.pack(len(raw)) + raw)
+    parts.append(_U32.pack(state.log_capacity))
+    parts.append(_U32.pack(len(state.log)))
+    for line in state.log:
+        raw = str(line).encode("utf-8")
+        parts.append(_U32.pack(len(raw)) + raw)
+    return b"".join(parts)
+
+
+def decode_binary(data: bytes) -> GameState:
+    magic, version = _HEADER.unpack_from(data, 0)
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a binary Pour Decisions save.")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary save version {version}.")
+    offset = _HEADER.size
+    day, age, energy, stress, cash, xp, reputation, rent_progress = _SCALARS.unpack_from(data, offset)
+    offset += _SCALARS.size
+
+    def read_text(prefix: struct.Struct) -> str:
+        nonlocal offset
+        (length,) = prefix.unpack_from(data, offset)
+        offset += prefix.size
+        text = data[offset : offset + length].decode("utf-8")
+        offset += length
+        return text
+
+    job_id = read_text(_U16)
+    (upgrade_count,) = _U16.unpack_from(data, offset)
+    offset += _U16.size
+    upgrades = [read_text(_U16) for _ in range(upgrade_count)]
+    (log_capacity,) = _U32.unpack_from(data, offset)
+    offset += _U32.size
+    (log_count,) = _U32.unpack_from(data, offset)
+    offset += _U32.size
+    log = [read_text(_U32) for _ in range(log_count)]
+    return GameState(
+        day=day,
+        age=age,
+        energy=energy,
+        stress=stress,
+        cash=cash,
+        xp=xp,
+        reputation=reputation,
+        rent_progress=rent_progress,
+        job_id=job_id,
+        owned_upgrades=upgrades,
+        log=log,
+        log_capacity=log_capacity,
+    )
+
+
+@timed("storage.encode")
+def _encode(state: GameState, binary: bool = False) -> bytes:
+    if binary:
+        return encode_binary(state)
+    return json.dumps(state.to_dict(), indent=2).encode("utf-8")
+
+
+@timed("storage.atomic_write")
+def _atomic_write(target: Path, payload: bytes, fsync: bool) -> None:
+    fd, temp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(payload)
+            if fsync:
+                handle.flush()
+                os.fsync(handle.fileno())
+        os.replace(temp_name, target)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def journal_path_for(path: Path) -> Path:
+    return path.with_suffix(".journal")
+
+
+def _position(items, item_id: str) -> Optional[int]:
+    return next((index for index, item in enumerate(items) if item.id == item_id), None)
+
+
+def _encode_action(action: str, args: Tuple[object, ...]) -> Optional[Tuple[int, int]]:
+    """The two journal arguments for ``action``, or None for an unknown id (a no-op action)."""
+    if action == "start_shift":
+        mode = args[0] if args else "bus"
+        if mode not in COMMUTE_MODES:
+            raise ValueError(f"cannot journal commute mode {mode!r}")
+        return COMMUTE_MODES.index(mode), 0
+    if action == "request_promotion":
+        index = data.JOB_INDEX.get(args[0])
+        return None if index is None else (index, 0)
+    if action == "purchase_upgrade":
+        index = _position(data.UPGRADES, args[0])
+        return None if index is None else (index, 0)
+    if action == "apply_story_choice":
+        event, choice = args
+        index = _position(data.STORY_EVENTS, event.id)
+        choice_index = _position(event.choices, choice.id)
+        if index is None or choice_index is None:
+            raise ValueError(f"cannot journal story choice {event.id}/{choice.id} outside the content tables")
+        return index, choice_index
+    return 0, 0
+
+
+def _apply_record(engine: GameEngine, code: int, first: int, second: int, seed: int) -> ActionReport:
+    action = JOURNAL_ACTIONS[code]
+    if action == "start_shift":
+        engine.rng.seed(seed)
+        return engine.start_shift(COMMUTE_MODES[first])
+    if action == "request_promotion":
+        return engine.request_promotion(data.JOBS[first].id)
+    if action == "purchase_upgrade":
+        return engine.purchase_upgrade(data.UPGRADES[first].id)
+    if action == "apply_story_choice":
+        event = data.STORY_EVENTS[first]
+        return engine.apply_story_choice(event, event.choices[second])
+    return getattr(engine, action)()
+
+
+def _records(journal: Path):
+    """Yield ``(seq, action code, first, second, seed)`` per intact record."""
+    if not journal.exists():
+        return
+    payload = journal.read_bytes()
+    for offset in range(0, len(payload) - RECORD_SIZE + 1, RECORD_SIZE):
+        body = payload[offset : offset + _RECORD.size]
+        (crc,) = _U32.unpack_from(payload, offset + _RECORD.size)
+        record = _RECORD.unpack(body)
+        if zlib.crc32(body) != crc or record[1] >= len(JOURNAL_ACTIONS):
+            # A torn final append from a crash; everything before it is intact.
+            return
+        yield record
+
+
+@timed("storage.replay")
+def _replay(state: GameState, journal: Path, after_seq: int) -> int:
+    """Apply journal records newer than ``after_seq`` to ``state``; return the last seq."""
+    seq = after_seq
+    engine = GameEngine(state, profile=False)
+    for record_seq, code, first, second, seed in _records(journal):
+        if record_seq <= seq:
+            continue
+        _apply_record(engine, code, first, second, seed)
+        seq = record_seq
+    return seq
+
+
+def _load_snapshot(target: Path) -> Tuple[GameState, Optional[int], bool]:
+    """Read a JSON or binary save; return the state, its journal seq and whether it was binary."""
+    payload = target.read_bytes()
+    if payload.startswith(BINARY_MAGIC):
+        return decode_binary(payload), None, True
+    raw = json.loads(payload)
+    seq = raw.get("journal_seq")
+    return GameState.from_dict(raw, fallback_job_id=data.JOBS[0].id), None if seq is None else int(seq), False
+
+
+def _restore(target: Path) -> Tuple[GameState, Optional[int], bool]:
+    """``_load_snapshot`` plus a replay of the journal, when the snapshot came from one.
+
+    A snapshot without a journal seq was written by a plain ``save_state``
+    and already holds everything; any journal beside it is stale and ignored.
+    """
+    state, seq, binary = _load_snapshot(target)
+    if seq is not None:
+        seq = _replay(state, journal_path_for(target), seq)
+    return state, seq, binary
+
+
+@timed("storage.load_state")
+def load_state(path: Optional[Path] = None, slot: Optional[str] = None) -> GameState:
+    """Load a JSON or binary save (detected from its header), replaying any journal.
+
+    With ``slot``, read that slot from the shared SQLite store at ``path``
+    (default ``DB_PATH``) instead.
+    """
+    if slot is not None:
+        return get_store(path).load(slot) or initial_state()
     target = path or SAVE_PATH
     if target.exists():
-        with target.open("r", encoding="utf-8") as handle:
-            raw = json.load(handle)
-        return GameState.from_dict(raw, fallback_job_id=JOBS[0].id)
+        state, seq, binary = _restore(target)
+        if seq is None:
+            _last_saved[target] = _encode(state, binary)
+        return state
     return initial_state()
 
 
-def save_state(state: GameState, path: Optional[Path] = None) -> None:
+@timed("storage.save_state")
+def save_state(
+    state: GameState,
+    path: Optional[Path] = None,
+    fsync: bool = False,
+    binary: bool = False,
+    slot: Optional[str] = None,
+) -> bool:
+    """Write ``state`` atomically as JSON or the compact binary format.
+
+    With ``slot``, write to the shared SQLite store at ``path`` instead.
+    Returns False without writing if the payload matches the last save.
+    """
+    if slot is not None:
+        return get_store(path).save(slot, state)
     target = path or SAVE_PATH
+    payload = _encode(state, binary)
+    if _last_saved.get(target) == payload and target.exists():
+        return False
     target.parent.mkdir(parents=True, exist_ok=True)
-    with target.open("w", encoding="utf-8") as handle:
-        json.dump(state.to_dict(), handle, indent=2)
+    _atomic_write(target, payload, fsync)
+    _last_saved[target] = payload
+    return True
+
+
+class Journal:
+    """Append-only action journal on top of a full snapshot taken every few days.
+
+    While attached, the journal shadows the engine's actions per instance (as
+    ``export.DayRecorder`` does) and appends one fixed-size record for each:
+    seq, action, two table indexes and, for shifts, the RNG seed the shift
+    was played with. The snapshot records the last seq it covers, so
+    ``load_state`` rebuilds the game from the snapshot plus a replay of newer
+    records, and a crash between snapshot and journal truncation never
+    applies a record twice. Records index the content tables, so a journal
+    replays under the packs it was written with; ``close`` snapshots so a
+    clean exit leaves the journal empty.
+    """
+
+    def __init__(
+        self,
+        engine: GameEngine,
+        path: Optional[Path] = None,
+        snapshot_every: int = 7,
+        fsync: bool = False,
+        seq: int = 0,
+    ) -> None:
+        self.engine = engine
+        self.path = path or SAVE_PATH
+        self.journal_path = journal_path_for(self.path)
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.seq = seq
+        self._seeds = random.Random()
+        self._snapshot_day = engine.state.day
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.journal_path.open("ab")
+        # Attributes this journal shadows, to put back on close (profiling wrappers live there too).
+        self._shadowed = {name: engine.__dict__.get(name) for name in JOURNAL_ACTIONS}
+        self._wrappers = {
+            name: self._journaled(code, name, getattr(engine, name)) for code, name in enumerate(JOURNAL_ACTIONS)
+        }
+        for name, wrapper in self._wrappers.items():
+            setattr(engine, name, wrapper)
+
+    @classmethod
+    def open(cls, path: Optional[Path] = None, snapshot_every: int = 7, fsync: bool = False) -> "Journal":
+        """Restore the game at ``path`` (snapshot plus journal) and keep journaling it."""
+        target = path or SAVE_PATH
+        seq = None
+        if target.exists():
+            state, seq, _ = _restore(target)
+        else:
+            state = initial_state()
+        journal = cls(GameEngine(state), target, snapshot_every, fsync, seq or 0)
+        if seq is None:
+            # Nothing on disk covers the journal yet (a plain save, or no save at
+            # all): start it from a fresh snapshot, dropping any stale records.
+            journal.snapshot()
+        return journal
+
+    def _journaled(self, code: int, name: str, action: Callable[..., ActionReport]) -> Callable[..., ActionReport]:
+        def run(*args: object) -> ActionReport:
+            arguments = None if self._handle.closed else _encode_action(name, args)
+            if arguments is None:
+                return action(*args)
+            seed = 0
+            if name == "start_shift":
+                seed = self._seeds.getrandbits(32)
+                self.engine.rng.seed(seed)
+            report = action(*args)
+            self._append(code, *arguments, seed)
+            if self.engine.state.day - self._snapshot_day >= self.snapshot_every:
+                self.snapshot()
+            return report
+
+        return run
+
+    def _append(self, code: int, first: int, second: int, seed: int) -> None:
+        self.seq += 1
+        record = _RECORD.pack(self.seq, code, first, second, seed)
+        self._handle.write(record + _U32.pack(zlib.crc32(record)))
+        self._handle.flush()
+        if self.fsync:
+            os.fsync(self._handle.fileno())
+
+    def snapshot(self) -> None:
+        """Write a full snapshot covering every record so far, then empty the journal."""
+        payload = dict(self.engine.state.to_dict(), journal_seq=self.seq)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.path, json.dumps(payload, indent=2).encode("utf-8"), self.fsync)
+        _last_saved.pop(self.path, None)
+        self._handle.truncate(0)
+        self._snapshot_day = self.engine.state.day
+
+    def close(self) -> None:
+        """Snapshot, stop journaling and unwind; closing again does nothing."""
+        if self._handle.closed:
+            return
+        self.snapshot()
+        self._handle.close()
+        engine = self.engine
+        for name, previous in self._shadowed.items():
+            if engine.__dict__.get(name) is not self._wrappers[name]:
+                continue
+            if previous is None:
+                del engine.__dict__[name]
+            else:
+                setattr(engine, name, previous)
+
+
+class SlotStore:
+    """Named save slots for many players in one SQLite database.
+
+    One connection is kept open in WAL mode and shared across threads. Writes
+    are committed every ``batch_size`` saves, on ``commit()`` and on close;
+    states are stored in the binary save format.
+    """
+
+    def __init__(self, path: Optional[Path] = None, batch_size: int = 32) -> None:
+        self.path = path or DB_PATH
+        self.batch_size = batch_size
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        import sqlite3  # deferred: only slot saves need it, and it is slow to import
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level="DEFERRED")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS saves ("
+            "slot TEXT PRIMARY KEY, profile TEXT, payload BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._closed = False
+        self._last: Dict[str, bytes] = {}
+
+    def load(self, slot: str) -> Optional[GameState]:
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM saves WHERE slot = ?", (slot,)).fetchone()
+        if row is None:
+            return None
+        self._last[slot] = bytes(row[0])
+        return decode_binary(row[0])
+
+    def save(self, slot: str, state: GameState, profile: Optional[str] = None) -> bool:
+        payload = encode_binary(state)
+        if self._last.get(slot) == payload:
+            return False
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO saves (slot, profile, payload) VALUES (?, ?, ?) "
+                "ON CONFLICT(slot) DO UPDATE SET payload = excluded.payload, "
+                "profile = COALESCE(excluded.profile, saves.profile)",
+                (slot, profile, payload),
+            )
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._commit()
+        self._last[slot] = payload
+        return True
+
+    def delete(self, slot: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM saves WHERE slot = ?", (slot,))
+            self._commit()
+        self._last.pop(slot, None)
+
+    def slots(self, profile: Optional[str] = None) -> List[str]:
+        with self._lock:
+            if profile is None:
+                rows = self._conn.execute("SELECT slot FROM saves ORDER BY slot").fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT slot FROM saves WHERE profile = ? ORDER BY slot", (profile,)
+                ).fetchall()
+        return [row[0] for row in rows]
+
+    def _commit(self) -> None:
+        self._conn.commit()
+        self._pending = 0
+
+    def commit(self) -> None:
+        with self._lock:
+            self._commit()
+
+    def close(self) -> None:
+        """Commit and close the connection. Closing again does nothing."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._commit()
+            self._conn.close()
+
+
+_stores: Dict[Path, SlotStore] = {}
+
+
+def get_store(path: Optional[Path] = None) -> SlotStore:
+    """Shared ``SlotStore`` per database path, closed (and committed) at exit."""
+    target = path or DB_PATH
+    store = _stores.get(target)
+    if store is None:
+        store = _stores[target] = SlotStore(target)
+        atexit.register(store.close)
+    return store
+
+
+class WriteBehindSaver:
+    """Coalescing background saver, so a save never blocks the caller on disk.
+
+    ``save`` snapshots the state and hands it to a worker thread that keeps
+    only the latest state per slot (``None`` is the save file). The worker
+    writes at most ``interval`` seconds after the first unsaved change, which
+    bounds how much play a crash can lose, and immediately on ``flush`` or
+    ``close``. Write errors are re-raised from the next ``flush``; the states
+    stay queued and are retried. ``interval=0`` writes synchronously in
+    ``save``.
+    """
+
+    def __init__(
+        self, interval: float = 1.0, path: Optional[Path] = None, fsync: bool = False, binary: bool = False
+    ) -> None:
+        self.interval = interval
+        self.path = path
+        self.fsync = fsync
+        self.binary = binary
+        self._pending: Dict[Optional[str], GameState] = {}
+        self._cond = threading.Condition()
+        # Saves handed in so far, and how many of those are on disk.
+        self._submitted = 0
+        self._written = 0
+        self._error: Optional[BaseException] = None
+        self._urgent = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        if interval > 0:
+            self._thread = threading.Thread(target=self._run, name="pour-decisions-saver", daemon=True)
+            self._thread.start()
+
+    def save(self, state: GameState, slot: Optional[str] = None) -> None:
+        """Queue ``state`` for ``slot``, replacing anything still queued for it."""
+        if self._thread is None:
+            self._write({slot: state})
+            return
+        snapshot = state.clone()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("saver is closed")
+            self._pending[slot] = snapshot
+            self._submitted += 1
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until everything queued before this call is written; re-raise a failed write."""
+        if self._thread is None:
+            return
+        with self._cond:
+            target = self._submitted
+            if self._written < target:
+                self._urgent = True
+                self._cond.notify_all()
+            if not self._cond.wait_for(lambda: self._written >= target or self._error is not None, timeout):
+                raise TimeoutError("saves still pending")
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Flush and stop the worker; later saves raise. Closing again does nothing."""
+        if self._thread is None or self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._thread.join()
+
+    def _write(self, batch: Dict[Optional[str], GameState]) -> None:
+        for slot, state in batch.items():
+            save_state(state, self.path, self.fsync, self.binary, slot)
+        if any(slot is not None for slot in batch):
+            get_store(self.path).commit()
+
+    def _run(self) -> None:
+        cond = self._cond
+        while True:
+            with cond:
+                cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                # Give later saves until the deadline to replace this one.
+                cond.wait_for(lambda: self._urgent or self._closed, self.interval)
+                batch, self._pending = self._pending, {}
+                self._urgent = False
+                submitted = self._submitted
+            try:
+                self._write(batch)
+            except BaseException as exc:  # noqa: BLE001 - reported by flush(), retried next round
+                with cond:
+                    for slot, state in batch.items():
+                        self._pending.setdefault(slot, state)
+                    self._error = exc
+                    cond.notify_all()
+                    if self._closed:
+                        return
+                    # Back off instead of spinning on a persistent failure.
+                    cond.wait_for(lambda: self._closed, self.interval)
+                continue
+            with cond:
+                self._written = submitted
+                self._error = None
+                # Every flush so far is satisfied once the queue is empty; don't rush the next save.
+                if not self._pending:
+                    self._urgent = False
+                cond.notify_all()
@@ -0,0 +1,49 @@
+import random
+
+from pour_decisions import advisor, profiling
+from pour_decisions.advisor import Advisor, legal_actions, state_key
+from pour_decisions.data import initial_state
+from pour_decisions.engine import GameEngine
+
+
+def _advisor(**kwargs):
+    # A rollout cap instead of a wall-clock budget keeps the search deterministic.
+    return Advisor(horizon=5, batch=4, max_rollouts=8, seed=1, **kwargs)
+
+
+def test_suggest_action_picks_a_legal_action():
+    engine = GameEngine(headless=True, rng=random.Random(0))
+    assert engine.suggest_action(budget_ms=20) in legal_actions(engine.state)
+
+
+def test_cache_keeps_rollouts_for_repeat_states():
+    state = initial_state()
+    search = _advisor()
+    first = search.suggest(state, budget_ms=10_000)
+    stats = search._cache[state_key(state)]
+    assert all(totals[1] == 8 for totals in stats.values())
+    # Same numeric state on a later day: the cached statistics answer without new rollouts.
+    later = state.clone()
+    later.day += 30
+    assert search.suggest(later, budget_ms=10_000) == first
+    assert len(search._cache) == 1 and search._cache[state_key(later)] is stats
+
+
+def test_cache_evicts_the_least_recently_used_state():
+    search = _advisor(cache_size=2)
+    states = [initial_state() for _ in range(3)]
+    for cash, state in zip((100, 200, 300), states):
+        state.cash = cash
+    search.suggest(states[0], budget_ms=10_000)
+    search.suggest(states[1], budget_ms=10_000)
+    search.suggest(states[0], budget_ms=10_000)
+    search.suggest(states[2], budget_ms=10_000)
+    assert list(search._cache) == [state_key(states[0]), state_key(states[2])]
+
+
+def test_rollout_engines_are_never_profiled(monkeypatch):
+    instrumented = []
+    monkeypatch.setattr(profiling, "instrument", lambda engine, stats: instrumented.append(engine))
+    monkeypatch.setattr(profiling, "enabled", True)
+    advisor.rollouts(initial_state(), "rest", 5, advisor.grind_policy, [1, 2])
+    assert instrumented == []
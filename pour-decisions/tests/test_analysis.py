@@ -0,0 +1,64 @@
+import random
+import statistics
+
+from pour_decisions import analysis, data, models
+from pour_decisions.engine import GameEngine
+from pour_decisions.sim import ACTIONS, grind_policy
+
+
+def _days_to_job(target: str, seed: int) -> int:
+    """Grind with a promotion request at the end of every day, as ``CareerChain(auto_promote=True)`` does."""
+    engine = GameEngine(headless=True, rng=random.Random(seed))
+    state = engine.state
+    days = 0
+    while state.job_id != target:
+        day = state.day
+        ACTIONS[grind_policy(engine)](engine)
+        if state.day == day:
+            engine.rest()
+        days += 1
+        engine.request_promotion(data.JOBS[engine.current_job_index + 1].id)
+    return days
+
+
+def test_expected_days_to_target_matches_simulation():
+    forecast = analysis.CareerChain().forecast(analysis.grind_chain_policy, 200, target_job="barback")
+    simulated = statistics.mean(_days_to_job("barback", seed) for seed in range(2000))
+    assert abs(forecast.expected_days_to_target - simulated) < 0.3
+
+
+def test_expected_days_counts_the_first_day():
+    forecast = analysis.Forecast(days=3, reached_probability=[1.0, 1.0, 1.0])
+    assert forecast.expected_days_to_target == 1.0
+
+
+def test_expected_days_is_zero_when_starting_at_the_target():
+    state = data.initial_state()
+    state.job_id = "barback"
+    forecast = analysis.CareerChain().forecast(analysis.grind_chain_policy, 5, state, target_job="barback")
+    assert forecast.expected_days_to_target == 0.0
+    assert analysis.CareerChain().forecast(analysis.grind_chain_policy, 0, state, target_job="barback").expected_days_to_target == 0.0
+
+
+def test_shift_distribution_models_scaled_commute_cash(monkeypatch):
+    # Halving cash_change is not additive: the car's repair bill must be halved too.
+    halve = models.ShiftEvent("halve", "Halve", "", ops=(models.EffectOp("cash_change", 0.5, 0, None),))
+    table = models.EventTable([halve])
+    monkeypatch.setattr(data, "SHIFT_EVENT_TABLE", table)
+    monkeypatch.setattr(analysis, "SHIFT_EVENT_TABLE", table)
+    analysis.shift_distribution.cache_clear()
+    try:
+        expected = analysis.expected_shift(0, frozenset({"car"}), "car").earnings
+    finally:
+        analysis.shift_distribution.cache_clear()
+
+    samples = []
+    for seed in range(20000):
+        state = data.initial_state()
+        state.owned_upgrades.add("car")
+        engine = GameEngine(state, headless=True, rng=random.Random(seed))
+        before = state.cash
+        engine.start_shift("car")
+        samples.append(state.cash - before)
+    error = (statistics.pvariance(samples) / len(samples)) ** 0.5
+    assert abs(statistics.mean(samples) - expected) <= 4 * error
@@ -0,0 +1,91 @@
+import random
+import statistics
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pour_decisions.batch import BatchEngine  # noqa: E402
+from pour_decisions.data import initial_state  # noqa: E402
+from pour_decisions.sim import grind_policy, run_policy  # noqa: E402
+
+CAREERS = 2000
+DAYS = 60
+FIELDS = ("cash", "xp", "energy", "stress", "reputation", "rent_progress")
+
+
+def _start(upgrades):
+    state = initial_state()
+    state.owned_upgrades.update(upgrades)
+    return state
+
+
+def _scalar(upgrades):
+    states = []
+    for seed in range(CAREERS):
+        state = _start(upgrades)
+        run_policy(grind_policy, DAYS, state, random.Random(seed))
+        states.append(state)
+    return {field: [getattr(state, field) for state in states] for field in FIELDS}
+
+
+def _batch(upgrades):
+    batch = BatchEngine([_start(upgrades) for _ in range(CAREERS)], seed=0)
+    car = np.full(CAREERS, "car" in upgrades)
+    for _ in range(DAYS):
+        tired = (batch.energy < 30) | (batch.stress > 80)
+        worked = batch.start_shift(~tired, car=car)
+        batch.rest(~worked)
+    return {field: getattr(batch, field).tolist() for field in FIELDS}
+
+
+@pytest.mark.parametrize("upgrades", [(), ("car",)], ids=["bus", "car"])
+def test_batch_means_track_the_scalar_engine(upgrades):
+    scalar, batch = _scalar(upgrades), _batch(upgrades)
+    for field in FIELDS:
+        error = (statistics.pvariance(scalar[field]) / CAREERS + statistics.pvariance(batch[field]) / CAREERS) ** 0.5
+        gap = abs(statistics.mean(scalar[field]) - statistics.mean(batch[field]))
+        assert gap <= 4 * error + 0.5, (field, gap, error)
+
+
+def test_lane_odds_are_within_one_part_in_65536():
+    from pour_decisions import batch
+    from pour_decisions.data import JOBS, SHIFT_EVENTS
+
+    lane = np.arange(1 << 16, dtype=np.uint16)
+    for job in JOBS:
+        low, high = job.pay_range
+        values = batch._randint(lane, np.int32(low), np.int32(high - low + 1))
+        odds = np.bincount(values - low, minlength=high - low + 1) / (1 << 16)
+        assert abs(odds - 1 / (high - low + 1)).max() <= 2 ** -16
+    weights = np.array([event.weight for event in SHIFT_EVENTS], dtype=np.float64)
+    picks = batch._EVENTS.pick(lane, None)
+    odds = np.bincount(picks, minlength=len(SHIFT_EVENTS) + 1) / (1 << 16)
+    expected = np.append(batch._EVENT_CHANCE * weights / weights.sum(), 1 - batch._EVENT_CHANCE)
+    assert abs(odds - expected).max() <= 2 ** -16
+
+
+@pytest.mark.parametrize("action", ["rest", "practice"])
+def test_rest_and_practice_match_the_scalar_engine_across_blocks(monkeypatch, action):
+    from pour_decisions import batch
+    from pour_decisions.data import UPGRADES
+    from pour_decisions.engine import GameEngine
+
+    monkeypatch.setattr(batch, "_BLOCK", 7)
+    rng = random.Random(0)
+    states = []
+    for _ in range(50):
+        state = _start(upgrade.id for upgrade in UPGRADES if rng.random() < 0.4)
+        state.energy, state.stress, state.rent_progress = rng.randint(0, 120), rng.randint(0, 140), rng.randint(0, 99)
+        state.cash = rng.randint(0, 400)
+        states.append(state)
+    chosen = np.array([rng.random() < 0.7 for _ in states])
+    engine = BatchEngine(states, seed=0)
+    acted = getattr(engine, action)(chosen)
+
+    for row, state in enumerate(states):
+        advanced = chosen[row] and getattr(GameEngine(state, headless=True), action)().day_advanced
+        assert acted[row] == advanced
+        mirrored = engine.state(row)
+        for field in FIELDS + ("day", "age", "job_id"):
+            assert getattr(mirrored, field) == getattr(state, field), (row, field)
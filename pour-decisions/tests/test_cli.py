@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from pour_decisions import cli, storage
+
+
+def _play(monkeypatch, tmp_path, lines, *args):
+    path = tmp_path / "savegame.json"
+    monkeypatch.setattr(storage, "SAVE_PATH", path)
+    feed = iter(lines)
+
+    def fake_input(prompt=""):
+        try:
+            return next(feed)
+        except StopIteration:
+            raise EOFError from None
+
+    monkeypatch.setattr("builtins.input", fake_input)
+    with pytest.raises(SystemExit):
+        cli.main(["--save-interval", "30", *args])
+    return json.loads(path.read_text())
+
+
+def test_end_of_input_flushes_queued_saves(monkeypatch, tmp_path):
+    assert _play(monkeypatch, tmp_path, ["2", "", "2", ""])["day"] == 3
+
+
+def test_save_and_quit_flushes(monkeypatch, tmp_path):
+    assert _play(monkeypatch, tmp_path, ["2", "", "8"])["day"] == 2
+
+
+def test_journal_mode_snapshots_on_exit(monkeypatch, tmp_path):
+    saved = _play(monkeypatch, tmp_path, ["2", "", "2", ""], "--journal")
+    assert saved["day"] == 3 and saved["journal_seq"] == 2
+    assert storage.journal_path_for(tmp_path / "savegame.json").stat().st_size == 0
@@ -0,0 +1,94 @@
+import pytest
+
+from pour_decisions import content
+from pour_decisions.content import PackError, compile_pack, load_pack
+
+PACK = """\
+name = "late-night"
+
+[[jobs]]
+id = "night-porter"
+title = "Night Porter"
+pay_range = [40, 70]
+xp_required = 200
+rent = 400
+
+[[shift_events]]
+id = "happy-hour"
+title = "Happy Hour"
+text = "Half-price wells."
+weight = 2
+effects = { tips = 20, wage = { mul = 0.9 }, stress_gain = { add = -3, min = 0 } }
+"""
+
+JOB = {"id": "porter", "title": "Porter", "pay_range": [40, 70], "xp_required": 0, "rent": 100}
+EVENT = {"id": "rush", "title": "Rush", "text": "Busy.", "effects": {"tips": 5}}
+STORY = {"id": "regular", "title": "A Regular", "text": "Hi.", "choices": [{"id": "chat", "label": "Chat.", "effects": {}}]}
+
+
+@pytest.mark.parametrize(
+    "raw, message",
+    [
+        ([], r"pack: expected an object"),
+        ({"levels": []}, r"unknown keys \['levels'\]"),
+        ({"jobs": [{k: v for k, v in JOB.items() if k != "rent"}]}, r"jobs\[0\]: missing 'rent'"),
+        ({"jobs": [dict(JOB, xp_required=True)]}, r"jobs\[0\]\.xp_required: expected int"),
+        ({"jobs": [dict(JOB, pay_range=[70, 40])]}, r"pay_range: expected \[low, high\]"),
+        ({"jobs": [JOB, JOB]}, r"jobs: duplicate id 'porter'"),
+        ({"upgrades": [{"id": "x", "name": "X", "cost": 1, "description": "", "effects": {"luck": 1}}]}, r"unknown keys \['luck'\]"),
+        ({"shift_events": [dict(EVENT, effects={"mood": 1})]}, r"unknown field 'mood'"),
+        ({"shift_events": [dict(EVENT, effects={"wage": {"mul": -1}})]}, r"wage\.mul: expected a non-negative number"),
+        ({"shift_events": [dict(EVENT, weight=-1)]}, r"weight: must not be negative"),
+        ({"story_events": [dict(STORY, choices=[])]}, r"needs at least one choice"),
+        ({"story_events": [dict(STORY, choices=STORY["choices"] * 2)]}, r"choices: duplicate id 'chat'"),
+    ],
+)
+def test_compile_pack_rejects_malformed_packs(raw, message):
+    with pytest.raises(PackError, match=message):
+        compile_pack(raw)
+
+
+def test_load_pack_reports_undecodable_files(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text("{not json")
+    with pytest.raises(PackError, match="broken.json"):
+        load_pack(path, cache_dir=None)
+
+
+def _summary(pack):
+    # ShiftEvent.apply is a fresh partial per build, so compare the data it is built from.
+    return (
+        pack.name,
+        pack.jobs,
+        pack.upgrades,
+        [(event.id, event.weight, event.ops, event.effect) for event in pack.shift_events],
+        pack.story_events,
+    )
+
+
+def test_load_pack_caches_the_compiled_pack_by_content_hash(tmp_path, monkeypatch):
+    path, cache = tmp_path / "late.toml", tmp_path / "cache"
+    path.write_text(PACK)
+    parsed = load_pack(path, cache_dir=cache)
+    assert parsed.name == "late-night" and [event.id for event in parsed.shift_events] == ["happy-hour"]
+    assert len(list(cache.iterdir())) == 1
+
+    compiled = []
+    monkeypatch.setattr(content, "compile_pack", lambda *args: compiled.append(args) or compile_pack(*args))
+    assert _summary(load_pack(path, cache_dir=cache)) == _summary(parsed)
+    assert compiled == []
+
+    path.write_text(PACK.replace("[40, 70]", "[45, 75]"))
+    changed = load_pack(path, cache_dir=cache)
+    assert len(compiled) == 1 and changed.jobs[0].pay_range == (45, 75)
+    assert len(list(cache.iterdir())) == 2
+
+
+def test_load_pack_recompiles_over_a_corrupt_cache_entry(tmp_path):
+    path, cache = tmp_path / "late.toml", tmp_path / "cache"
+    path.write_text(PACK)
+    parsed = load_pack(path, cache_dir=cache)
+    (entry,) = cache.iterdir()
+    entry.write_bytes(b"\x00garbage")
+    assert _summary(load_pack(path, cache_dir=cache)) == _summary(parsed)
+    assert _summary(load_pack(path, cache_dir=None)) == _summary(parsed)
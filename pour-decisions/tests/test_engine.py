@@ -0,0 +1,31 @@
+import random
+
+from pour_decisions import data
+from pour_decisions.engine import GameEngine
+
+
+def _every_action(engine: GameEngine) -> None:
+    event = data.STORY_EVENTS[0]
+    engine.state.cash = 5000
+    engine.state.xp = 5000
+    engine.start_shift("bus")
+    engine.rest()
+    engine.practice()
+    engine.pay_rent_now()
+    engine.purchase_upgrade("jigger")
+    engine.request_promotion("barback")
+    engine.apply_story_choice(event, event.choices[0])
+
+
+def test_headless_engines_keep_no_log():
+    engine = GameEngine(headless=True, rng=random.Random(0))
+    before = list(engine.state.log)
+    _every_action(engine)
+    assert list(engine.state.log) == before
+
+
+def test_engines_log_every_action():
+    engine = GameEngine(rng=random.Random(0))
+    _every_action(engine)
+    codes = {entry.code for entry in engine.state.log}
+    assert {"rest", "practice", "rent-paid-early", "upgrade-bought", "promoted", "story"} <= codes
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from pour_decisions import export
+from pour_decisions.engine import GameEngine
+from pour_decisions.sim import grind_policy, run_policy
+
+
+def _play(engine: GameEngine, days: int) -> None:
+    for _ in range(days):
+        engine.rest()
+
+
+def test_day_profile_stopping_keeps_the_recorder():
+    engine = GameEngine(headless=True, rng=random.Random(0))
+    records = []
+    recorder = engine.record_days(records.append)
+    engine.profile_days(2)
+    _play(engine, 5)
+    assert [record.day for record in records] == [2, 3, 4, 5, 6]
+    recorder.stop()
+    _play(engine, 1)
+    assert len(records) == 5 and "_advance_day" not in engine.__dict__
+
+
+def test_recorder_stopping_keeps_the_day_profile():
+    engine = GameEngine(headless=True, rng=random.Random(0))
+    records = []
+    recorder = engine.record_days(records.append)
+    profile = engine.profile_days(3)
+    recorder.stop()
+    _play(engine, 4)
+    # The profile ran its days and stopped; the stopped recorder left underneath it emits nothing.
+    assert profile.done and engine.state.day == 5
+    assert records == []
+
+
+def test_trajectory_matches_run_policy():
+    days = [tuple(snapshot) for snapshot in run_policy(grind_policy, 300, rng=random.Random(7))]
+    records = export.trajectory(grind_policy, 300, rng=random.Random(7))
+    assert [tuple(record[1:10]) for record in records] == days
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl", ".ptraj"])
+def test_sinks_write_every_row(tmp_path, suffix):
+    records = list(export.careers(grind_policy, 3, 50))
+    path = tmp_path / f"run{suffix}"
+    with export.open_sink(path, chunk_size=16) as sink:
+        assert sink.write_all(records) == len(records)
+    if suffix == ".ptraj":
+        assert list(export.read_records(path)) == records
+    else:
+        assert len(path.read_text().splitlines()) == len(records) + (suffix == ".csv")
+
+
+def test_trajectory_sink_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        export.TrajectorySink(tmp_path / "rows.txt")
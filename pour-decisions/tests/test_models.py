@@ -0,0 +1,28 @@
+import pytest
+
+from pour_decisions.engine import GameEngine
+from pour_decisions.models import GameState
+from pour_decisions.storage import load_state, save_state
+
+
+def test_owned_upgrades_accepts_a_list():
+    state = GameState(1, 21, 80, 12, 500, 0, 10, 0, "glass-collector", owned_upgrades=["sneakers"])
+    engine = GameEngine(state, headless=True)
+    engine.purchase_upgrade("jigger")
+    assert state.owned_upgrades == {"sneakers", "jigger"}
+
+
+@pytest.mark.parametrize("binary", [False, True], ids=["json", "binary"])
+def test_upgrades_keep_purchase_order_through_saves(tmp_path, binary):
+    state = GameState(1, 21, 80, 12, 5000, 0, 10, 0, "glass-collector")
+    engine = GameEngine(state, headless=True)
+    for upgrade_id in ("jigger", "car", "sneakers"):
+        assert engine.purchase_upgrade(upgrade_id).day_advanced is False
+    assert state.to_dict()["owned_upgrades"] == ["jigger", "car", "sneakers"]
+
+    path = tmp_path / "save.sav"
+    save_state(state, path, binary=binary)
+    loaded = load_state(path)
+    assert list(loaded.owned_upgrades) == ["jigger", "car", "sneakers"]
+    assert list(loaded.clone().owned_upgrades) == ["jigger", "car", "sneakers"]
+    assert loaded.owned_upgrades == {"car", "jigger", "sneakers"}
@@ -0,0 +1,34 @@
+import asyncio
+import logging
+
+from pour_decisions import data, server
+
+
+def test_failed_periodic_save_is_logged_and_retried(tmp_path, caplog):
+    async def run():
+        game = server.GameServer(tmp_path / "saves.db", save_interval=0.01)
+        await game._start()
+        write = game._write
+        failures = []
+
+        def flaky(batch):
+            if not failures:
+                failures.append(batch)
+                raise OSError("disk full")
+            return write(batch)
+
+        game._write = flaky
+        game.mark_dirty("ada", data.initial_state())
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if failures and not game._dirty:
+                break
+        await game.close()
+        return failures, game
+
+    with caplog.at_level(logging.ERROR, logger="pour_decisions.server"):
+        failures, game = asyncio.run(run())
+    assert failures and not game._dirty
+    record = next(record for record in caplog.records if record.name == "pour_decisions.server")
+    assert record.getMessage() == "save failed, will retry"
+    assert record.exc_info and isinstance(record.exc_info[1], OSError)
@@ -0,0 +1,13 @@
+import pytest
+
+from pour_decisions.sim import grind_policy, run_careers
+
+
+@pytest.mark.parametrize("careers", [0, 2, 23])
+def test_run_careers_does_not_depend_on_the_worker_count(careers):
+    serial = run_careers(grind_policy, careers, 40, seed=5, workers=1)
+    assert serial.careers == careers
+    assert run_careers(grind_policy, careers, 40, seed=5, workers=3) == serial
+    if careers:
+        # Sanity check that the comparison can fail at all.
+        assert run_careers(grind_policy, careers, 40, seed=6, workers=1) != serial
@@ -0,0 +1,27 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pour_decisions import solver  # noqa: E402
+from pour_decisions.advisor import legal_actions  # noqa: E402
+from pour_decisions.data import initial_state  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def table():
+    grid = solver.Grid(energy_step=40, stress_step=35, rent_step=50, cash_step=250, cash_cap=1000, xp_step=250)
+    return solver.solve(candidates=("mixology-course", "car"), grid=grid, gamma=0.9, tolerance=5.0)
+
+
+def test_car_commute_needs_a_car(table):
+    car = table.actions.index("shift-car")
+    car_bit = 1 << table.candidates.index("car")
+    for mask in range(table.policy.shape[1]):
+        if not mask & car_bit:
+            assert not (table.policy[:, mask] == car).any()
+    state = initial_state()
+    assert table.action(state) in legal_actions(state)
+
+
+def test_policy_codes_fit_every_action(table):
+    assert np.iinfo(table.policy.dtype).max >= len(table.actions) - 1
@@ -0,0 +1,245 @@
+import json
+import os
+import random
+import time
+
+import pytest
+
+from pour_decisions import data, storage
+from pour_decisions.data import initial_state
+from pour_decisions.engine import GameEngine
+from pour_decisions.models import GameState, LogEntry
+from pour_decisions.storage import (
+    RECORD_SIZE,
+    Journal,
+    SlotStore,
+    WriteBehindSaver,
+    decode_binary,
+    encode_binary,
+    get_store,
+    journal_path_for,
+    load_state,
+    save_state,
+)
+
+
+def _state(entries: int, capacity: int) -> GameState:
+    state = initial_state()
+    state.log_capacity = capacity
+    # Newest first, as the engine keeps it.
+    return GameState.from_dict(
+        dict(state.to_dict(), log=[f"entry {index}" for index in range(entries, 0, -1)], log_capacity=capacity),
+        fallback_job_id=state.job_id,
+    )
+
+
+def test_long_log_keeps_the_newest_entries():
+    state = GameState(1, 21, 80, 12, 120, 0, 10, 0, "glass-collector", log=[f"entry {index}" for index in range(30, 0, -1)])
+    assert list(map(str, state.log)) == [f"entry {index}" for index in range(30, 10, -1)]
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_log_capacity_round_trips(tmp_path, binary):
+    state = _state(8, capacity=5)
+    path = tmp_path / "save.sav"
+    save_state(state, path, binary=binary)
+    loaded = load_state(path)
+    assert loaded.log_capacity == 5
+    assert list(map(str, loaded.log)) == [f"entry {index}" for index in range(8, 3, -1)]
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_played_state_round_trips(tmp_path, binary):
+    engine = GameEngine(rng=random.Random(3))
+    for _ in range(6):
+        engine.start_shift("bus")
+        engine.rest()
+    path = tmp_path / "save.sav"
+    save_state(engine.state, path, binary=binary)
+    loaded = load_state(path)
+    assert loaded == engine.state
+    assert all(isinstance(entry, LogEntry) for entry in loaded.log)
+
+
+def test_binary_rejects_unknown_versions():
+    payload = bytearray(encode_binary(_state(3, capacity=20)))
+    payload[4:6] = (2).to_bytes(2, "little")
+    with pytest.raises(ValueError, match="version 2"):
+        decode_binary(bytes(payload))
+
+
+def _play_journal(journal: Journal) -> None:
+    engine = journal.engine
+    event = data.STORY_EVENTS[0]
+    engine.start_shift("bus")
+    engine.purchase_upgrade("sneakers")
+    engine.purchase_upgrade("no-such-upgrade")
+    engine.apply_story_choice(event, event.choices[-1])
+    engine.rest()
+    engine.start_shift("bus")
+    engine.practice()
+
+
+def test_journal_appends_fixed_size_records_and_replays(tmp_path):
+    path = tmp_path / "savegame.json"
+    rich = initial_state()
+    rich.cash = 500
+    save_state(rich, path)
+    journal = Journal.open(path, snapshot_every=100)
+    _play_journal(journal)
+    # The unknown upgrade changes nothing and is not journaled.
+    assert journal_path_for(path).stat().st_size == 6 * RECORD_SIZE
+    assert json.loads(path.read_text())["day"] == 1
+    expected = journal.engine.state.to_dict()
+    # Crash without a snapshot: both entry points replay the journal.
+    journal._handle.close()
+    assert load_state(path).to_dict() == expected
+    assert Journal.open(path, snapshot_every=100).engine.state.to_dict() == expected
+
+
+def test_journal_ignores_a_torn_final_record(tmp_path):
+    path = tmp_path / "savegame.json"
+    journal = Journal.open(path, snapshot_every=100)
+    journal.engine.rest()
+    expected = journal.engine.state.to_dict()
+    journal.engine.rest()
+    journal._handle.close()
+    with journal_path_for(path).open("r+b") as handle:
+        handle.truncate(2 * RECORD_SIZE - 3)
+    assert load_state(path).to_dict() == expected
+
+
+def test_journal_compacts_into_snapshots(tmp_path):
+    path = tmp_path / "savegame.json"
+    journal = Journal.open(path, snapshot_every=3)
+    for _ in range(4):
+        journal.engine.rest()
+    snapshot = json.loads(path.read_text())
+    assert snapshot["day"] == 4 and snapshot["journal_seq"] == 3
+    assert journal_path_for(path).stat().st_size == RECORD_SIZE
+    journal.close()
+    assert journal_path_for(path).stat().st_size == 0
+    assert load_state(path).day == 5
+    assert "rest" not in journal.engine.__dict__
+
+
+def test_plain_save_makes_the_journal_stale(tmp_path):
+    path = tmp_path / "savegame.json"
+    journal = Journal.open(path, snapshot_every=100)
+    journal.engine.rest()
+    journal.engine.rest()
+    journal._handle.close()
+    state = load_state(path)
+    assert state.day == 3
+    # A plain save already holds the journaled days; neither loader may replay them again.
+    save_state(state, path)
+    assert load_state(path).day == 3
+    reopened = Journal.open(path)
+    assert reopened.engine.state.day == 3
+    reopened.engine.rest()
+    reopened._handle.close()
+    assert load_state(path).day == 4
+
+
+def test_saves_still_coalesce_after_an_empty_flush(tmp_path):
+    saver = WriteBehindSaver(interval=0.5, path=tmp_path / "save.json")
+    batches = []
+    write = saver._write
+    saver._write = lambda batch: (batches.append(dict(batch)), write(batch))
+    try:
+        saver.flush()
+        state = initial_state()
+        saver.save(state)
+        time.sleep(0.05)
+        state.cash += 1
+        saver.save(state)
+        saver.flush()
+    finally:
+        saver.close()
+    assert len(batches) == 1
+    assert load_state(tmp_path / "save.json").cash == state.cash
+
+
+def test_crash_mid_write_leaves_the_old_save_intact(tmp_path, monkeypatch):
+    path = tmp_path / "save.json"
+    state = initial_state()
+    save_state(state, path)
+    before = path.read_bytes()
+
+    def crash(fd):
+        raise OSError("disk gone")
+
+    # The new payload is fully in the temp file when fsync fails, as in a crash before the rename.
+    monkeypatch.setattr(storage.os, "fsync", crash)
+    state.cash += 50
+    with pytest.raises(OSError):
+        save_state(state, path, fsync=True)
+    assert path.read_bytes() == before
+    assert [entry.name for entry in tmp_path.iterdir()] == ["save.json"]
+
+    monkeypatch.undo()
+    assert save_state(state, path) is True
+    assert load_state(path).cash == state.cash
+
+
+def test_unchanged_state_skips_the_write(tmp_path):
+    path = tmp_path / "save.json"
+    state = initial_state()
+    assert save_state(state, path) is True
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    assert save_state(state.clone(), path) is False
+    assert path.stat().st_mtime_ns == 1_000_000_000
+
+    state.cash += 1
+    assert save_state(state, path) is True
+    assert path.stat().st_mtime_ns != 1_000_000_000
+
+
+def _career(cash: int, upgrade: str) -> GameState:
+    state = initial_state()
+    state.cash = cash
+    state.owned_upgrades.add(upgrade)
+    return state
+
+
+def test_slot_store_keeps_slots_apart_and_survives_reopen(tmp_path):
+    path = tmp_path / "saves.db"
+    store = SlotStore(path, batch_size=100)
+    alice, bob = _career(10, "car"), _career(20, "sneakers")
+    assert store.save("alice", alice, profile="p1") is True
+    assert store.save("bob", bob, profile="p2") is True
+    assert store.save("alice", alice) is False
+    assert store.load("alice") == alice and store.load("bob") == bob
+    assert store.load("carol") is None
+    assert store.slots() == ["alice", "bob"] and store.slots("p2") == ["bob"]
+    store.close()
+
+    reopened = SlotStore(path)
+    try:
+        assert reopened.load("alice") == alice and reopened.load("bob") == bob
+        # A save without a profile keeps the one the slot already has.
+        alice.cash += 5
+        assert reopened.save("alice", alice) is True
+        assert reopened.slots("p1") == ["alice"]
+        reopened.delete("bob")
+        assert reopened.slots() == ["alice"]
+    finally:
+        reopened.close()
+
+
+def test_get_store_shares_one_store_per_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_stores", {})
+    path = tmp_path / "saves.db"
+    store = get_store(path)
+    assert get_store(path) is store and get_store(tmp_path / "other.db") is not store
+    state = _career(42, "car")
+    assert save_state(state, path, slot="alice") is True
+    assert load_state(path, slot="alice") == state
+    assert load_state(path, slot="nobody") == initial_state()
+    store.close()
+    store.close()
+    reopened = SlotStore(path)
+    try:
+        assert reopened.load("alice") == state
+    finally:
+        reopened.close()